@@ -1,5 +1,6 @@
 from django.contrib import admin
 
+from .images import schedule_variants
 from .models import Post, Location, Category
 
 
@@ -14,11 +15,7 @@ class PostAdmin(admin.ModelAdmin):
         'is_published',
         'created_at',
         'image',
-        'post',
-        'first_name',
-        'last_name',
-        'email',
-        'address'
+        'comment_count',
     )
     list_editable = (
         'is_published',
@@ -42,6 +39,11 @@ class CategoryAdmin(admin.ModelAdmin):
         'slug',
     )
 
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if 'image' in form.changed_data:
+            schedule_variants(obj.image)
+
 
 class LocationAdmin(admin.ModelAdmin):
     list_display = (
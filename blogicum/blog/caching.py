@@ -0,0 +1,299 @@
+"""Кэширование лент публикаций и страниц блога."""
+import json
+from functools import wraps
+from hashlib import md5
+from math import ceil
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.db import connections, transaction
+from django.db.models import Min
+from django.http import HttpResponse
+from django.utils import timezone
+
+from .constants import (
+    FEED_COUNT_CACHE_TIMEOUT,
+    FEED_COUNT_ESTIMATE_THRESHOLD,
+    FEED_SCHEDULE_TIMEOUT,
+    PAGE_CACHE_TIMEOUT,
+)
+
+
+INDEX_FEED = ('index', None)
+
+
+def category_feed(category_id):
+    """Лента категории."""
+    return ('category', category_id)
+
+
+def profile_feed(author_id):
+    """Лента автора."""
+    return ('profile', author_id)
+
+
+def post_feeds(post):
+    """Ленты, в которых может оказаться пост."""
+    feeds = [INDEX_FEED, profile_feed(post.author_id)]
+    if post.category_id is not None:
+        feeds.append(category_feed(post.category_id))
+    return feeds
+
+
+def feed_count_key(feed):
+    kind, pk = feed
+    return f'feed-count:{kind}' if pk is None else f'feed-count:{kind}:{pk}'
+
+
+def estimate_count(queryset):
+    """Оценка числа строк по плану запроса.
+
+    Планировщик PostgreSQL знает примерный размер выборки без её обхода;
+    для остальных СУБД и неразобранного плана функция возвращает None.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    # QuerySet.explain() в Django 3.2 отдаёт repr списка, а не JSON:
+    # план читается напрямую, psycopg2 сам декодирует столбец json.
+    try:
+        sql, params = queryset.order_by().query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+    except (EmptyResultSet, LookupError, TypeError, ValueError):
+        return None
+
+
+class FeedCounter:
+    """Кэширующий провайдер общего числа постов ленты.
+
+    Значение живёт в кэше до изменения постов ленты (см. blog.signals);
+    на больших лентах вместо COUNT(*) используется оценка планировщика.
+    """
+
+    def __init__(self, feed):
+        self.feed = feed
+
+    def __call__(self, queryset):
+        key = feed_count_key(self.feed)
+        count = cache.get(key)
+        if count is None:
+            count = estimate_count(queryset)
+            if count is None or count < FEED_COUNT_ESTIMATE_THRESHOLD:
+                count = queryset.count()
+            cache.set(key, count,
+                      feed_timeout(self.feed, FEED_COUNT_CACHE_TIMEOUT))
+        return count
+
+
+def invalidate_feed_caches(feeds):
+    """Сбрасывает закэшированные счётчики и расписание лент."""
+    cache.delete_many([feed_count_key(feed) for feed in feeds]
+                      + [_feed_schedule_key(feed) for feed in feeds])
+
+
+# Отложенные публикации появляются в ленте без записи в базу,
+# когда их pub_date становится меньше timezone.now(). Поэтому
+# кэш ленты не должен жить дольше, чем до ближайшей такой публикации.
+
+_NOTHING_SCHEDULED = 'nothing-scheduled'
+
+
+def _feed_schedule_key(feed):
+    kind, pk = feed
+    return f'feed-next:{kind}' if pk is None else f'feed-next:{kind}:{pk}'
+
+
+def _scheduled_posts(feed):
+    from .models import Post
+
+    kind, pk = feed
+    posts = Post.objects.filter(
+        is_published=True, pub_date__gt=timezone.now())
+    if kind == 'category':
+        return posts.filter(category_id=pk)
+    if kind == 'profile':
+        return posts.filter(author_id=pk)
+    return posts.filter(category__is_published=True)
+
+
+def next_publication(feed):
+    """Время ближайшей отложенной публикации ленты или None."""
+    key = _feed_schedule_key(feed)
+    pub_date = cache.get(key)
+    if pub_date is None:
+        pub_date = _scheduled_posts(feed).aggregate(
+            next=Min('pub_date'))['next']
+        if pub_date is None:
+            cache.set(key, _NOTHING_SCHEDULED, FEED_SCHEDULE_TIMEOUT)
+            return None
+        cache.set(key, pub_date, _seconds_until(pub_date))
+    if pub_date == _NOTHING_SCHEDULED or pub_date <= timezone.now():
+        return None
+    return pub_date
+
+
+def _seconds_until(moment):
+    return max(1, ceil((moment - timezone.now()).total_seconds()))
+
+
+def feed_timeout(feed, timeout):
+    """Время жизни кэша ленты с учётом отложенных публикаций."""
+    pub_date = next_publication(feed)
+    if pub_date is None:
+        return timeout
+    return min(timeout, _seconds_until(pub_date))
+
+
+# Кэш страниц для анонимных посетителей.
+#
+# Каждая запись хранит версии тегов, от которых зависит страница:
+# ленты, постов на ней, их авторов, категорий и мест. Сигналы меняют
+# версии только затронутых тегов, и запись, чьи версии устарели,
+# считается промахом. Так новый комментарий сбрасывает страницы
+# своего поста, не трогая остальной кэш, а бэкенду достаточно
+# get_many/set_many — подходят и locmem, и файловый кэш.
+#
+# Версии тега читаются в tag_request(), а общая эпоха всех тегов —
+# до вызова view. Если к сохранению ответа хоть одна из них сменилась,
+# страница могла собраться из старых данных и не кэшируется.
+
+PAGE_CACHE_PARAMS = ('page', 'after', 'before', 'q')
+
+
+def feed_tag(feed):
+    kind, pk = feed
+    return f'feed:{kind}' if pk is None else f'feed:{kind}:{pk}'
+
+
+def post_tags(post):
+    """Теги страницы, на которой выведен пост."""
+    tags = {f'post:{post.pk}', f'author:{post.author_id}'}
+    if post.category_id is not None:
+        tags.add(f'category:{post.category_id}')
+    if post.location_id is not None:
+        tags.add(f'location:{post.location_id}')
+    return tags
+
+
+def page_tags(page_obj, feed):
+    """Теги страницы ленты."""
+    tags = {feed_tag(feed)}
+    for post in page_obj:
+        tags |= post_tags(post)
+    return tags
+
+
+def tag_feed_page(request, page_obj, feed):
+    """Помечает страницу ленты: теги и срок жизни по расписанию ленты."""
+    tag_request(request, page_tags(page_obj, feed))
+    if hasattr(request, '_cache_feeds'):
+        request._cache_feeds.add(feed)
+
+
+_TAG_EPOCH_KEY = 'cache-tag-epoch'
+
+
+def _tag_key(tag):
+    return f'cache-tag:{tag}'
+
+
+def _set_tag_versions(tags):
+    versions = {_tag_key(tag): uuid4().hex for tag in tags}
+    versions[_TAG_EPOCH_KEY] = uuid4().hex
+    cache.set_many(versions, None)
+
+
+def bump_tags(tags, using=None):
+    """Делает недействительными все страницы с этими тегами.
+
+    Как LookupCache.invalidate: сразу и ещё раз после фиксации
+    транзакции, иначе страница, собранная до фиксации, сохранилась бы
+    под новой версией.
+    """
+    tags = set(tags)
+    _set_tag_versions(tags)
+    transaction.on_commit(lambda: _set_tag_versions(tags), using=using)
+
+
+def _tag_versions(tags, create=False):
+    keys = {_tag_key(tag): tag for tag in tags}
+    versions = cache.get_many(keys)
+    if create and len(versions) < len(keys):
+        for key in keys.keys() - versions.keys():
+            cache.add(key, uuid4().hex, None)
+        versions = cache.get_many(keys)
+    return {keys[key]: version for key, version in versions.items()}
+
+
+def tag_request(request, tags):
+    """Добавляет теги к странице, которую рендерит view.
+
+    Версии тегов читаются сразу: вызывать до того, как выводить данные.
+    """
+    if hasattr(request, '_cache_tags'):
+        new_tags = set(tags) - request._cache_tags.keys()
+        if new_tags:
+            request._cache_tags.update(
+                _tag_versions(new_tags, create=True))
+
+
+def _page_cache_key(request, kwargs):
+    params = [(name, request.GET.get(name)) for name in PAGE_CACHE_PARAMS]
+    raw = repr((sorted(kwargs.items()), params)).encode()
+    view_name = request.resolver_match.view_name
+    return f'page:{view_name}:{md5(raw).hexdigest()}'
+
+
+def anonymous_page_cache(view):
+    """Кэширует ответ view для неавторизованных посетителей.
+
+    View сообщает, от чего зависит страница, через tag_request().
+    """
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if (request.method not in ('GET', 'HEAD')
+                or request.user.is_authenticated):
+            return view(request, *args, **kwargs)
+        key = _page_cache_key(request, kwargs)
+        found = cache.get_many([key, _TAG_EPOCH_KEY])
+        entry = found.get(key)
+        if entry is not None:
+            if _tag_versions(entry['tags']) == entry['tags']:
+                return HttpResponse(
+                    entry['content'], content_type=entry['content_type'])
+
+        epoch = found.get(_TAG_EPOCH_KEY)
+        request._cache_tags = {}
+        request._cache_feeds = set()
+        response = view(request, *args, **kwargs)
+
+        def store(response):
+            if response.status_code != 200 or response.cookies:
+                return
+            tags = request._cache_tags
+            if (cache.get(_TAG_EPOCH_KEY) != epoch
+                    or _tag_versions(tags) != tags):
+                return
+            timeout = PAGE_CACHE_TIMEOUT
+            for feed in request._cache_feeds:
+                timeout = feed_timeout(feed, timeout)
+            cache.set(key, {
+                'tags': tags,
+                'content': response.content,
+                'content_type': response['Content-Type'],
+            }, timeout)
+
+        if getattr(response, 'is_rendered', True):
+            store(response)
+        else:
+            response.add_post_render_callback(store)
+        return response
+
+    return wrapper
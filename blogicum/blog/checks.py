@@ -0,0 +1,36 @@
+"""Системные проверки настроек блога."""
+from django.conf import settings
+from django.core.checks import Error, register
+
+# Хранилища сессий, которые держат сессию только в кэше.
+CACHE_SESSION_ENGINES = (
+    'django.contrib.sessions.backends.cache',
+    'blog.sessions',
+)
+# Кэши, которые видит только свой процесс.
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def process_local_cache(alias):
+    return settings.CACHES[alias]['BACKEND'] in PROCESS_LOCAL_CACHES
+
+
+@register()
+def check_session_cache(app_configs, **kwargs):
+    if settings.SESSION_ENGINE not in CACHE_SESSION_ENGINES:
+        return []
+    if not process_local_cache(settings.SESSION_CACHE_ALIAS):
+        return []
+    backend = settings.CACHES[settings.SESSION_CACHE_ALIAS]['BACKEND']
+    return [Error(
+        f'SESSION_ENGINE {settings.SESSION_ENGINE} хранит сессии в кэше '
+        f'{settings.SESSION_CACHE_ALIAS!r}, а {backend} виден только '
+        'своему процессу: вход на одном рабочем процессе не найдётся '
+        'на другом.',
+        hint="Укажите общий кэш (Redis, Memcached, FileBasedCache) или "
+             "BLOG_SESSION_MODE = 'db'.",
+        id='blog.E001',
+    )]
@@ -1,2 +1,20 @@
 MAX_LENGTH_TEXT = 256  # Максимальная длина текстового поля
 NUMBER_OF_RECORDS_ON_THE_PAGE = 10  # Кол-во записей на странице
+PAGINATION_CURSOR_DEPTH = 10  # Страница, с которой пагинация идёт курсором
+COMMENTS_PER_PAGE = 50  # Кол-во комментариев, выводимых за раз
+FEED_COUNT_CACHE_TIMEOUT = 60 * 15  # Время жизни закэшированного числа постов
+FEED_COUNT_ESTIMATE_THRESHOLD = 100_000  # С какого числа постов считать оценку
+PAGE_CACHE_TIMEOUT = 60 * 5  # Время жизни кэша страниц для анонимов
+AUTHOR_CACHE_TIMEOUT = 60 * 60 * 24  # Время жизни сведений об авторе в кэше
+LOOKUP_LOCAL_TIMEOUT = 60  # Срок справочников и авторов при кэше процесса
+FEED_SCHEDULE_TIMEOUT = 60 * 60  # Как часто перепроверять отложенные посты
+EXCERPT_WORDS = 10  # Кол-во слов в анонсе поста для карточки ленты
+THUMBNAIL_WIDTHS = (320, 640, 1280)  # Ширины копий изображений, px
+THUMBNAIL_FORMATS = ('webp', 'jpeg')  # Форматы копий, первый — основной
+MEDIA_MAX_AGE = 60 * 60 * 24  # Время кэширования медиафайлов браузером
+MEDIA_IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365  # То же для неизменных блобов
+EXPORT_CHUNK_SIZE = 2000  # Кол-во строк, читаемых из базы за раз при выгрузке
+PROFILING_WINDOW = 200  # Сколько последних замеров view хранить в памяти
+PROFILING_TOP_TEMPLATES = 5  # Сколько самых долгих шаблонов показывать
+SESSION_FLUSH_INTERVAL = 30  # Сколько секунд сессия может ждать записи в базу
+SESSION_FLUSH_BATCH = 500  # Сколько сессий в буфере записывать не дожидаясь
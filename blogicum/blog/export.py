@@ -0,0 +1,68 @@
+"""Потоковая выгрузка содержимого блога в JSON Lines и CSV."""
+import csv
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .constants import EXPORT_CHUNK_SIZE
+from .models import Category, Comment, Location, Post
+
+
+# Что выгружается: модель и поля для values_list.
+EXPORTS = {
+    'posts': (Post, (
+        'id', 'title', 'text', 'pub_date', 'created_at', 'is_published',
+        'author_id', 'author__username', 'category_id', 'location_id',
+        'image', 'comment_count',
+    )),
+    'comments': (Comment, (
+        'id', 'post_id', 'author_id', 'author__username', 'text',
+        'created_at',
+    )),
+    'categories': (Category, (
+        'id', 'title', 'slug', 'description', 'is_published', 'created_at',
+    )),
+    'locations': (Location, (
+        'id', 'name', 'is_published', 'created_at',
+    )),
+}
+
+
+def export_rows(kind, chunk_size=EXPORT_CHUNK_SIZE):
+    """Строки таблицы порциями по chunk_size.
+
+    iterator() не кэширует результат в QuerySet, а на PostgreSQL
+    читает через серверный курсор, так что память не растёт
+    с размером таблицы.
+    """
+    model, fields = EXPORTS[kind]
+    return model.objects.order_by('pk').values_list(*fields).iterator(
+        chunk_size=chunk_size)
+
+
+def jsonl_lines(kind, chunk_size=EXPORT_CHUNK_SIZE):
+    _, fields = EXPORTS[kind]
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for row in export_rows(kind, chunk_size):
+        yield encoder.encode(dict(zip(fields, row))) + '\n'
+
+
+class _Echo:
+    """Файл для csv.writer, который возвращает строку вместо записи."""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(kind, chunk_size=EXPORT_CHUNK_SIZE):
+    _, fields = EXPORTS[kind]
+    writer = csv.writer(_Echo())
+    yield writer.writerow(fields)
+    for row in export_rows(kind, chunk_size):
+        yield writer.writerow(row)
+
+
+# Формат: генератор строк, тип содержимого, расширение файла.
+FORMATS = {
+    'jsonl': (jsonl_lines, 'application/x-ndjson', 'jsonl'),
+    'csv': (csv_lines, 'text/csv', 'csv'),
+}
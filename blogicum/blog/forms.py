@@ -8,6 +8,16 @@ from blog.models import Post, Comment
 User = get_user_model()
 
 
+class StreamedImageField(forms.ImageField):
+    """Поле изображения, учитывающее отказ StreamingImageUploadHandler."""
+
+    def to_python(self, data):
+        rejection = getattr(data, 'rejection', None)
+        if rejection:
+            raise forms.ValidationError(rejection, code='rejected')
+        return super().to_python(data)
+
+
 class CreateForm(forms.ModelForm):
     """Форма создания"""
 
@@ -15,6 +25,9 @@ class CreateForm(forms.ModelForm):
         model = Post
         exclude = ('author',)
         fields = '__all__'
+        field_classes = {
+            'image': StreamedImageField,
+        }
         widgets = {
             'pub_date': forms.DateInput(attrs={'type': 'date'})
         }
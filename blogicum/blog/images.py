@@ -0,0 +1,147 @@
+"""Уменьшенные копии изображений постов и категорий."""
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from .caching import bump_tags
+from .constants import THUMBNAIL_FORMATS, THUMBNAIL_WIDTHS
+
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+def variant_name(name, width, image_format):
+    """Имя файла копии: blog_image/cat.png -> blog_image/cat-640.webp."""
+    root, _ = os.path.splitext(name)
+    extension = 'jpg' if image_format == 'jpeg' else image_format
+    return f'{root}-{width}.{extension}'
+
+
+def generate_variants(name, storage):
+    """Создаёт копии изображения всех ширин и форматов.
+
+    Копии шире оригинала не создаются. Возвращает имена созданных файлов.
+    """
+    with storage.open(name) as source:
+        image = ImageOps.exif_transpose(Image.open(source))
+        image.load()
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+    created = []
+    for width in THUMBNAIL_WIDTHS:
+        if width >= image.width:
+            continue
+        height = round(image.height * width / image.width)
+        resized = image.resize((width, height), Image.LANCZOS)
+        for image_format in THUMBNAIL_FORMATS:
+            target = variant_name(name, width, image_format)
+            frame = resized
+            if image_format == 'jpeg' and frame.mode == 'RGBA':
+                frame = frame.convert('RGB')
+            buffer = BytesIO()
+            frame.save(buffer, image_format, quality=80, optimize=True)
+            if storage.exists(target):
+                storage.delete(target)
+            created.append(
+                storage.save(target, ContentFile(buffer.getvalue())))
+    cache.set(_widths_key(name), [
+        width for width in THUMBNAIL_WIDTHS if width < image.width
+    ], None)
+    return created
+
+
+def _widths_key(name):
+    return f'image-variants:{name}'
+
+
+def variant_widths(name, storage=default_storage):
+    """Ширины созданных копий изображения.
+
+    generate_variants() записывает их в кэш; если записи нет (копии
+    созданы до этого или кэш очищен), наличие файлов проверяется один
+    раз. add(), а не set(): результат проверки не должен затереть
+    список, записанный генерацией в это время.
+    """
+    key = _widths_key(name)
+    widths = cache.get(key)
+    if widths is None:
+        widths = [
+            width for width in THUMBNAIL_WIDTHS
+            if storage.exists(variant_name(name, width, THUMBNAIL_FORMATS[0]))
+        ]
+        cache.add(key, widths, None)
+    return widths
+
+
+def available_variants(field_file, image_format):
+    """Пары (ширина, url) уже созданных копий."""
+    storage = default_storage
+    return [
+        (width, storage.url(variant_name(field_file.name, width,
+                                         image_format)))
+        for width in variant_widths(field_file.name, storage)
+    ]
+
+
+def _run(name, storage, on_done):
+    try:
+        generate_variants(name, storage)
+        if on_done is not None:
+            on_done()
+    except Exception:
+        logger.exception('Не удалось создать копии изображения %s', name)
+
+
+def _run_in_worker(name, storage, on_done):
+    try:
+        _run(name, storage, on_done)
+    finally:
+        close_old_connections()
+
+
+def schedule_variants(field_file, on_done=None):
+    """Ставит создание копий в очередь пула после фиксации транзакции.
+
+    Запрос не ждёт обработки изображения. При BLOG_THUMBNAIL_WORKERS = 0
+    копии создаются синхронно, что удобно в тестах.
+    """
+    global _executor
+
+    if not field_file:
+        return
+    # Копии пишутся под предсказуемыми именами рядом с оригиналом,
+    # поэтому в обычное хранилище, а не в хранилище блобов.
+    name, storage = field_file.name, default_storage
+    workers = getattr(settings, 'BLOG_THUMBNAIL_WORKERS', 2)
+    if not workers:
+        transaction.on_commit(lambda: _run(name, storage, on_done))
+        return
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix='thumbnails')
+    transaction.on_commit(
+        lambda: _executor.submit(_run_in_worker, name, storage, on_done))
+
+
+def schedule_post_variants(post):
+    """Копии изображения поста; по готовности карточка поста обновится."""
+    from .models import Post
+
+    pk = post.pk
+
+    def refresh_card():
+        Post.objects.filter(pk=pk).update(modified_at=timezone.now())
+        bump_tags({f'post:{pk}'})
+
+    schedule_variants(post.image, refresh_card)
@@ -0,0 +1,250 @@
+"""Связанные объекты карточек и комментариев без JOIN.
+
+Категории и места — маленькие, редко меняющиеся таблицы: каждый
+процесс держит их целиком. Версия таблицы лежит в общем кэше (CACHES):
+сигналы моделей меняют её, и все процессы перечитывают таблицу при
+следующем обращении. Объекты общие для потоков и запросов — только
+для чтения.
+
+Пользователей много, поэтому в общем кэше лежат краткие сведения
+о каждом авторе, которого выводила страница.
+
+Если CACHES['default'] виден только своему процессу (LocMemCache),
+версии и сведения об авторах до других процессов не доходят: тогда
+справочники и авторы перечитываются не реже LOOKUP_LOCAL_TIMEOUT
+секунд.
+"""
+from itertools import islice
+from time import monotonic
+from uuid import uuid4
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models.query import ModelIterable
+
+from .checks import process_local_cache
+from .constants import AUTHOR_CACHE_TIMEOUT, LOOKUP_LOCAL_TIMEOUT
+
+
+def _local_cache():
+    return process_local_cache(DEFAULT_CACHE_ALIAS)
+
+
+class _Snapshot:
+    __slots__ = ('version', 'expires', 'by_id', 'by_slug')
+
+    def __init__(self, version, rows, slug_field):
+        self.version = version
+        self.expires = (monotonic() + LOOKUP_LOCAL_TIMEOUT
+                        if _local_cache() else None)
+        self.by_id = {row.pk: row for row in rows}
+        self.by_slug = ({getattr(row, slug_field): row for row in rows}
+                        if slug_field else {})
+
+
+class LookupCache:
+    """Все строки модели по id (и по slug), сверенные с версией в кэше."""
+
+    # Таблица читается целиком из базы по умолчанию.
+    per_database = False
+
+    def __init__(self, model_label, slug_field=None):
+        self.model_label = model_label
+        self.slug_field = slug_field
+        self.version_key = f'lookup-version:{model_label.lower()}'
+        self._snapshot = None
+
+    def _version(self):
+        version = cache.get(self.version_key)
+        if version is None:
+            cache.add(self.version_key, uuid4().hex, None)
+            version = cache.get(self.version_key)
+        return version
+
+    def snapshot(self):
+        # Версия читается до строк: правка между двумя чтениями
+        # сменит версию, и таблица перечитается при следующем вызове.
+        version = self._version()
+        snapshot = self._snapshot
+        if (snapshot is None or snapshot.version != version
+                or snapshot.expires is not None
+                and snapshot.expires <= monotonic()):
+            model = apps.get_model(self.model_label)
+            snapshot = self._snapshot = _Snapshot(
+                version, list(model._base_manager.all()), self.slug_field)
+        return snapshot
+
+    def get(self, pk):
+        return self.snapshot().by_id.get(pk)
+
+    def get_many(self, ids):
+        by_id = self.snapshot().by_id
+        return {pk: by_id[pk] for pk in ids if pk in by_id}
+
+    def get_published(self, slug):
+        """Опубликованная запись по slug или None."""
+        row = self.snapshot().by_slug.get(slug)
+        return row if row is not None and row.is_published else None
+
+    def _bump(self):
+        cache.set(self.version_key, uuid4().hex, None)
+
+    def invalidate(self, using=None):
+        """Новая версия сразу и ещё раз после фиксации транзакции.
+
+        Иначе другой процесс мог бы успеть перечитать таблицу
+        до фиксации и закэшировать старые строки под новой версией.
+        """
+        self._bump()
+        transaction.on_commit(self._bump, using=using)
+
+
+categories = LookupCache('blog.Category', slug_field='slug')
+locations = LookupCache('blog.Location')
+
+
+class AuthorCache:
+    """Имя, ФИО, роль и дата регистрации автора в общем кэше.
+
+    Автор собирается как User с отложенными остальными полями:
+    сравнение с request.user работает, а save() запишет только
+    загруженные поля.
+    """
+
+    fields = ('id', 'username', 'first_name', 'last_name', 'is_staff',
+              'date_joined')
+    per_database = True
+
+    @staticmethod
+    def _summary_key(pk):
+        return f'author:{pk}'
+
+    @staticmethod
+    def _username_key(username):
+        return f'author-id:{username}'
+
+    @staticmethod
+    def _timeout():
+        return (LOOKUP_LOCAL_TIMEOUT if _local_cache()
+                else AUTHOR_CACHE_TIMEOUT)
+
+    def _field_names(self):
+        # Порядок полей модели: его ожидает Model.from_db().
+        return [field.attname
+                for field in get_user_model()._meta.concrete_fields
+                if field.attname in self.fields]
+
+    def _build(self, row, using):
+        return get_user_model().from_db(using, self._field_names(), row)
+
+    def _query(self, using):
+        return get_user_model()._base_manager.using(using).values_list(
+            *self._field_names())
+
+    def get_many(self, ids, using=DEFAULT_DB_ALIAS):
+        keys = {self._summary_key(pk): pk for pk in ids}
+        rows = {keys[key]: row for key, row in cache.get_many(keys).items()}
+        missing = keys.values() - rows.keys()
+        if missing:
+            fresh = {row[0]: row
+                     for row in self._query(using).filter(pk__in=missing)}
+            cache.set_many({self._summary_key(pk): row
+                            for pk, row in fresh.items()},
+                           self._timeout())
+            rows.update(fresh)
+        return {pk: self._build(row, using) for pk, row in rows.items()}
+
+    def get_by_username(self, username, using=DEFAULT_DB_ALIAS):
+        """Автор по имени или None; переименованный — промах кэша."""
+        pk = cache.get(self._username_key(username))
+        if pk is not None:
+            author = self.get_many([pk], using).get(pk)
+            if author is not None and author.username == username:
+                return author
+        row = self._query(using).filter(username=username).first()
+        if row is None:
+            return None
+        cache.set_many({
+            self._summary_key(row[0]): row,
+            self._username_key(username): row[0],
+        }, self._timeout())
+        return self._build(row, using)
+
+    def _delete(self, pk):
+        cache.delete(self._summary_key(pk))
+
+    def invalidate(self, user, using=None):
+        """Как LookupCache.invalidate: сразу и после фиксации."""
+        self._delete(user.pk)
+        transaction.on_commit(lambda: self._delete(user.pk), using=using)
+
+
+authors = AuthorCache()
+
+
+def invalidate_lookups(using=None):
+    """После пакетных вставок, которые не вызывают сигналов."""
+    categories.invalidate(using)
+    locations.invalidate(using)
+
+
+class CachedRelationsIterable(ModelIterable):
+    """Объекты со связями из кэша вместо JOIN.
+
+    Связи подставляются пачками: на пачку — один get_many.
+    Если объекта нет и в кэше, и в базе (удалён после выборки),
+    связь загрузится обычным запросом при обращении.
+    """
+
+    relations = ()
+    batch_size = 100
+
+    def __iter__(self):
+        model = self.queryset.model
+        using = self.queryset.db
+        relations = [(model._meta.get_field(name), source)
+                     for name, source in self.relations]
+        objects = super().__iter__()
+        while True:
+            batch = list(islice(objects, self.batch_size))
+            if not batch:
+                return
+            for field, source in relations:
+                ids = {getattr(obj, field.attname) for obj in batch} - {None}
+                related = (source.get_many(ids, using) if source.per_database
+                           else source.get_many(ids))
+                for obj in batch:
+                    related_id = getattr(obj, field.attname)
+                    if related_id is None:
+                        field.set_cached_value(obj, None)
+                    elif related_id in related:
+                        field.set_cached_value(obj, related[related_id])
+            yield from batch
+
+
+class PostRelationsIterable(CachedRelationsIterable):
+    relations = (
+        ('author', authors),
+        ('category', categories),
+        ('location', locations),
+    )
+
+
+class CommentRelationsIterable(CachedRelationsIterable):
+    relations = (('author', authors),)
+
+
+RELATION_ITERABLES = {
+    'blog.post': PostRelationsIterable,
+    'blog.comment': CommentRelationsIterable,
+}
+
+
+def with_cached_relations(queryset):
+    """Queryset поста или комментария со связями из кэша."""
+    queryset = queryset._chain()
+    queryset._iterable_class = RELATION_ITERABLES[
+        queryset.model._meta.label_lower]
+    return queryset
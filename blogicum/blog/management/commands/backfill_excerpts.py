@@ -0,0 +1,40 @@
+"""Заполнение анонсов постов, созданных до появления поля excerpt."""
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from blog.models import Post
+from blog.utils import make_excerpt
+
+
+class Command(BaseCommand):
+    help = 'Заполняет Post.excerpt у постов, где он пуст.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Сколько постов обновлять за один запрос.')
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Пересчитать анонсы всех постов, а не только пустые.')
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        manager = Post.objects.using(options['database'])
+        posts = manager.only('id', 'text').order_by('pk')
+        if not options['all']:
+            posts = posts.filter(excerpt='')
+        updated = 0
+        batch = []
+        for post in posts.iterator(chunk_size=batch_size):
+            post.excerpt = make_excerpt(post.text)
+            batch.append(post)
+            if len(batch) == batch_size:
+                manager.bulk_update(batch, ['excerpt'])
+                updated += len(batch)
+                batch = []
+        if batch:
+            manager.bulk_update(batch, ['excerpt'])
+            updated += len(batch)
+        self.stdout.write(
+            self.style.SUCCESS(f'Заполнено анонсов: {updated}'))
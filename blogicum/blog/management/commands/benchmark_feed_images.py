@@ -0,0 +1,93 @@
+"""Сколько байт изображений скачивает посетитель страницы ленты."""
+import json
+from html.parser import HTMLParser
+from urllib.parse import unquote
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.test import Client
+
+
+class _PictureParser(HTMLParser):
+    """Собирает изображения страницы: src и srcset (webp и обычный)."""
+
+    def __init__(self):
+        super().__init__()
+        self.images = []
+        self._webp = ''
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'source' and attrs.get('type') == 'image/webp':
+            self._webp = attrs.get('srcset', '')
+        elif tag == 'img' and 'img-thumbnail' in attrs.get('class', ''):
+            self.images.append(
+                (attrs.get('src'), self._webp, attrs.get('srcset', '')))
+            self._webp = ''
+
+    def handle_endtag(self, tag):
+        if tag == 'picture':
+            self._webp = ''
+
+
+def _candidates(srcset):
+    result = []
+    for candidate in filter(None, (c.strip() for c in srcset.split(','))):
+        url, width = candidate.rsplit(' ', 1)
+        result.append((int(width.rstrip('w')), url))
+    return sorted(result)
+
+
+def _choose(srcset, needed_width):
+    """Кандидат, которого выберет браузер: самый узкий не уже слота."""
+    candidates = _candidates(srcset)
+    for width, url in candidates:
+        if width >= needed_width:
+            return url
+    return candidates[-1][1] if candidates else None
+
+
+def _size(url):
+    name = unquote(url)
+    if name.startswith(default_storage.base_url):
+        name = name[len(default_storage.base_url):]
+    try:
+        return default_storage.size(name)
+    except OSError:
+        return 0
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает объём изображений страницы ленты: оригиналы '
+            'против копий, выбранных по srcset. Результат — JSON.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='/', help='Страница ленты.')
+        parser.add_argument(
+            '--slot-width', type=int, default=640,
+            help='Ширина карточки в CSS-пикселях (40rem).')
+        parser.add_argument(
+            '--dpr', type=float, default=1.0,
+            help='Плотность пикселей экрана.')
+
+    def handle(self, *args, **options):
+        response = Client().get(options['url'])
+        parser = _PictureParser()
+        parser.feed(response.content.decode('utf-8'))
+        needed_width = options['slot_width'] * options['dpr']
+        original_bytes = derived_bytes = 0
+        for src, webp, srcset in parser.images:
+            original = _size(src)
+            original_bytes += original
+            chosen = _choose(webp or srcset, needed_width)
+            derived_bytes += _size(chosen) if chosen else original
+        self.stdout.write(json.dumps({
+            'url': options['url'],
+            'images': len(parser.images),
+            'slot_width': needed_width,
+            'original_bytes': original_bytes,
+            'srcset_bytes': derived_bytes,
+            'saved_percent': round(
+                100 * (1 - derived_bytes / original_bytes), 1
+            ) if original_bytes else 0,
+        }, indent=2))
@@ -0,0 +1,77 @@
+"""Лента для авторизованного пользователя при разных хранилищах сессий."""
+import json
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+from django.urls import reverse
+
+from blog.sessions import pending_sessions
+
+
+class Command(BaseCommand):
+    help = ('Прогоняет benchmark_views для главной страницы с входом '
+            'пользователя при каждом BLOG_SESSION_MODE. Результат — JSON.')
+
+    def add_arguments(self, parser):
+        modes = list(settings.BLOG_SESSION_ENGINES)
+        parser.add_argument(
+            '--session-mode', action='append', choices=modes,
+            dest='session_modes',
+            help='Хранилище сессий; по умолчанию все.')
+        parser.add_argument('--user', help='Имя пользователя для входа; '
+                                           'по умолчанию первый.')
+        parser.add_argument(
+            '--save-every-request', action='store_true',
+            help='SESSION_SAVE_EVERY_REQUEST: запись сессии на каждый '
+                 'запрос, как при скользящем сроке жизни.')
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--warmup', type=int, default=10)
+        parser.add_argument('--mode', choices=('client', 'wsgi'),
+                            default='wsgi')
+        parser.add_argument('--concurrency', type=int, default=4)
+        parser.add_argument('--label', default='',
+                            help='Метка прогона, например хэш коммита.')
+
+    def handle(self, *args, **options):
+        username = options['user']
+        if username is None:
+            user = get_user_model().objects.order_by('pk').first()
+            if user is None:
+                raise CommandError('В базе нет пользователей.')
+            username = user.username
+        results = {}
+        for session_mode in (options['session_modes']
+                             or settings.BLOG_SESSION_ENGINES):
+            with override_settings(
+                SESSION_ENGINE=settings.BLOG_SESSION_ENGINES[session_mode],
+                SESSION_SAVE_EVERY_REQUEST=options['save_every_request'],
+            ):
+                results[session_mode] = self.measure(username, options)
+            # Отложенные записи не должны достаться следующему режиму.
+            pending_sessions.flush()
+        self.stdout.write(json.dumps({
+            'label': options['label'],
+            'mode': options['mode'],
+            'concurrency': options['concurrency'],
+            'save_every_request': options['save_every_request'],
+            'sessions': results,
+        }, indent=2, ensure_ascii=False))
+
+    @staticmethod
+    def measure(username, options):
+        out = StringIO()
+        call_command(
+            'benchmark_views',
+            url=[f"index={reverse('blog:index')}"],
+            user=username,
+            requests=options['requests'],
+            warmup=options['warmup'],
+            mode=options['mode'],
+            concurrency=options['concurrency'],
+            stdout=out,
+        )
+        return json.loads(out.getvalue())['views']['index']
@@ -0,0 +1,89 @@
+"""Стоимость отрисовки шаблона с кэшем скомпилированных шаблонов и без."""
+import json
+from time import perf_counter
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.template import RequestContext
+from django.test import RequestFactory
+
+from blog.caching import INDEX_FEED, FeedCounter
+from blog.models import Post
+from blog.querysets import (
+    apply_feed_fields,
+    apply_publication_filters,
+    apply_publication_ordering,
+)
+from blog.templating import copy_engine, default_engine, preload_templates
+from blog.utils import paginated_page_object, percentile
+
+
+def index_context(request):
+    """Контекст главной страницы с заранее выбранными постами.
+
+    Запросы к базе выполняются до замера: он касается только шаблонов.
+    """
+    posts = apply_feed_fields(apply_publication_ordering(
+        apply_publication_filters(Post.objects.all())))
+    page_obj = paginated_page_object(
+        posts, request, counter=FeedCounter(INDEX_FEED))
+    page_obj.object_list = list(page_obj.object_list)
+    page_obj.paginator.count
+    return {'page_obj': page_obj}
+
+
+class Command(BaseCommand):
+    help = ('Замеряет первую и последующие отрисовки шаблона без кэша '
+            'шаблонов, с cached.Loader и с предзагрузкой. Результат — JSON.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200,
+                            help='Отрисовок для установившегося режима.')
+        parser.add_argument('--template', default='blog/index.html')
+        parser.add_argument('--label', default='',
+                            help='Метка прогона, например хэш коммита.')
+
+    def handle(self, *args, **options):
+        request = RequestFactory().get('/')
+        request.user = AnonymousUser()
+        context = index_context(request)
+        self.options = options
+        self.request = request
+        self.context = context
+        base = default_engine()
+        # Прогон без замера: ленивые значения контекста вычисляются
+        # один раз и не попадают в первую отрисовку.
+        self.render(copy_engine(base, cached=False))
+        results = {
+            'uncached': self.measure(copy_engine(base, cached=False)),
+            'cached': self.measure(copy_engine(base, cached=True)),
+        }
+        engine = copy_engine(base, cached=True)
+        compiled, _, elapsed = preload_templates(engine)
+        results['preloaded'] = {
+            'templates': compiled,
+            'preload_ms': round(elapsed * 1000, 2),
+            **self.measure(engine),
+        }
+        self.stdout.write(json.dumps({
+            'label': options['label'],
+            'template': options['template'],
+            'engines': results,
+        }, indent=2, ensure_ascii=False))
+
+    def render(self, engine):
+        start = perf_counter()
+        engine.get_template(self.options['template']).render(
+            RequestContext(self.request, self.context))
+        return (perf_counter() - start) * 1000
+
+    def measure(self, engine):
+        first = self.render(engine)
+        samples = [self.render(engine)
+                   for _ in range(self.options['requests'])]
+        return {
+            'first_ms': round(first, 2),
+            'p50_ms': round(percentile(samples, 50), 2),
+            'p95_ms': round(percentile(samples, 95), 2),
+            'mean_ms': round(sum(samples) / len(samples), 2),
+        }
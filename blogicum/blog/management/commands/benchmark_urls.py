@@ -0,0 +1,61 @@
+"""Микробенчмарк построения URL блога: blog_url против reverse."""
+import json
+from timeit import Timer
+
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from blog.routes import blog_url
+
+
+# URL из карточки поста, комментариев, шапки и ссылки на категорию.
+CASES = {
+    'index': ('blog:index', ()),
+    'post_detail': ('blog:post_detail', (12345,)),
+    'profile': ('blog:profile', ('traveller_42',)),
+    'profile_unicode': ('blog:profile', ('путешественник',)),
+    'category_posts': ('blog:category_posts', ('mountain-trips',)),
+    'edit_comment': ('blog:edit_comment', (12345, 678)),
+    'delete_comment': ('blog:delete_comment', (12345, 678)),
+}
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает blog_url (готовые шаблоны маршрутов) и '
+            'django.urls.reverse: микросекунды на вызов. Результат — JSON.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--number', type=int, default=20_000,
+                            help='Вызовов в одном замере.')
+        parser.add_argument('--repeat', type=int, default=5,
+                            help='Замеров; берётся лучший.')
+        parser.add_argument('--label', default='',
+                            help='Метка прогона, например хэш коммита.')
+
+    def handle(self, *args, **options):
+        results = {}
+        for case, (view_name, url_args) in CASES.items():
+            expected = reverse(view_name, args=url_args)
+            if blog_url(view_name, *url_args) != expected:
+                raise CommandError(
+                    f'{case}: blog_url расходится с reverse ({expected}).')
+            reverse_us = self.timeit(
+                lambda: reverse(view_name, args=url_args), options)
+            blog_url_us = self.timeit(
+                lambda: blog_url(view_name, *url_args), options)
+            results[case] = {
+                'url': expected,
+                'reverse_us': round(reverse_us, 2),
+                'blog_url_us': round(blog_url_us, 2),
+                'speedup': round(reverse_us / blog_url_us, 1),
+            }
+        self.stdout.write(json.dumps({
+            'label': options['label'],
+            'urls': results,
+        }, indent=2, ensure_ascii=False))
+
+    @staticmethod
+    def timeit(call, options):
+        timer = Timer(call)
+        best = min(timer.repeat(options['repeat'], options['number']))
+        return best / options['number'] * 1_000_000
@@ -0,0 +1,193 @@
+"""Нагрузочный замер страниц блога: задержки, пропускная способность, SQL."""
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.core.servers.basehttp import (
+    ThreadedWSGIServer,
+    WSGIRequestHandler,
+)
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.urls import reverse
+
+from blog.constants import PAGINATION_CURSOR_DEPTH
+from blog.models import Category, Post
+from blog.querysets import apply_publication_filters
+from blog.utils import percentile
+
+
+User = get_user_model()
+
+
+class QueryCounter:
+    """execute_wrapper, считающий запросы всех потоков."""
+
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        with self._lock:
+            self.count += 1
+        return execute(sql, params, many, context)
+
+
+class _QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def default_targets():
+    """Страницы блога на самых тяжёлых для них данных."""
+    targets = {'index': reverse('blog:index')}
+    targets['index_deep'] = (
+        f"{targets['index']}?page={PAGINATION_CURSOR_DEPTH}")
+    posts = apply_publication_filters(Post.objects.all())
+    category = Category.objects.filter(is_published=True).annotate(
+        total=Count('posts')).order_by('-total').first()
+    if category is not None:
+        targets['category_posts'] = reverse(
+            'blog:category_posts', args=[category.slug])
+    author = User.objects.annotate(
+        total=Count('posts')).order_by('-total').first()
+    if author is not None:
+        targets['profile'] = reverse('blog:profile', args=[author.username])
+    post = posts.order_by('-comment_count').first()
+    if post is not None:
+        targets['post_detail'] = reverse('blog:post_detail', args=[post.id])
+    return targets
+
+
+class Command(BaseCommand):
+    help = ('Замеряет страницы блога: p50/p95/p99, запросы в секунду '
+            'и SQL-запросы на страницу. Результат — JSON.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=100,
+                            help='Запросов к каждой странице.')
+        parser.add_argument('--warmup', type=int, default=5,
+                            help='Запросов без замера перед каждой страницей.')
+        parser.add_argument(
+            '--mode', choices=('client', 'wsgi'), default='client',
+            help='client — тестовый клиент Django в том же потоке, '
+                 'wsgi — локальный многопоточный WSGI-сервер.')
+        parser.add_argument('--concurrency', type=int, default=1,
+                            help='Параллельных клиентов в режиме wsgi.')
+        parser.add_argument('--user', help='Имя пользователя для входа.')
+        parser.add_argument('--cold', action='store_true',
+                            help='Очищать кэш перед каждым запросом.')
+        parser.add_argument(
+            '--url', action='append', default=[], metavar='NAME=PATH',
+            help='Страница для замера вместо стандартного набора.')
+        parser.add_argument('--label', default='',
+                            help='Метка прогона, например хэш коммита.')
+
+    def handle(self, *args, **options):
+        if options['concurrency'] > 1 and options['mode'] != 'wsgi':
+            raise CommandError('--concurrency работает только с --mode wsgi.')
+        targets = dict(
+            url.split('=', 1) for url in options['url']
+        ) or default_targets()
+        client = Client()
+        if options['user']:
+            try:
+                client.force_login(User.objects.get(
+                    username=options['user']))
+            except User.DoesNotExist:
+                raise CommandError(
+                    f'Пользователь {options["user"]} не найден.')
+        self.options = options
+        self.counter = QueryCounter()
+        if options['mode'] == 'wsgi':
+            results = self.run_wsgi(targets, client)
+        else:
+            results = {name: self.measure(url, self.client_get(client))
+                       for name, url in targets.items()}
+        self.stdout.write(json.dumps({
+            'label': options['label'],
+            'mode': options['mode'],
+            'concurrency': options['concurrency'],
+            'authenticated': bool(options['user']),
+            'cold_cache': options['cold'],
+            'views': results,
+        }, indent=2, ensure_ascii=False))
+
+    def client_get(self, client):
+        def get(url):
+            with connection.execute_wrapper(self.counter):
+                return client.get(url).status_code
+        return get
+
+    def run_wsgi(self, targets, client):
+        application = WSGIHandler()
+
+        def counted(environ, start_response):
+            with connection.execute_wrapper(self.counter):
+                return application(environ, start_response)
+
+        server = ThreadedWSGIServer(('127.0.0.1', 0), _QuietHandler)
+        server.set_app(counted)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        host, port = server.server_address
+        cookie = client.cookies.get(settings.SESSION_COOKIE_NAME)
+        headers = {'Cookie': f'{cookie.key}={cookie.value}'} if cookie else {}
+
+        def get(url):
+            request = Request(f'http://{host}:{port}{url}', headers=headers)
+            try:
+                with urlopen(request) as response:
+                    response.read()
+                    return response.status
+            except HTTPError as error:
+                return error.code
+
+        try:
+            return {name: self.measure(url, get)
+                    for name, url in targets.items()}
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def measure(self, url, get):
+        options = self.options
+        for _ in range(options['warmup']):
+            get(url)
+
+        def timed(_):
+            if options['cold']:
+                cache.clear()
+            start = time.perf_counter()
+            status = get(url)
+            return time.perf_counter() - start, status
+
+        self.counter.count = 0
+        started = time.perf_counter()
+        if options['concurrency'] == 1:
+            samples = [timed(i) for i in range(options['requests'])]
+        else:
+            with ThreadPoolExecutor(options['concurrency']) as pool:
+                samples = list(pool.map(timed, range(options['requests'])))
+        elapsed = time.perf_counter() - started
+        latencies = [duration * 1000 for duration, _ in samples]
+        return {
+            'url': url,
+            'requests': len(samples),
+            'errors': sum(status >= 400 for _, status in samples),
+            'p50_ms': round(percentile(latencies, 50), 2),
+            'p95_ms': round(percentile(latencies, 95), 2),
+            'p99_ms': round(percentile(latencies, 99), 2),
+            'mean_ms': round(sum(latencies) / len(latencies), 2),
+            'rps': round(len(samples) / elapsed, 1),
+            'queries': round(self.counter.count / len(samples), 2),
+        }
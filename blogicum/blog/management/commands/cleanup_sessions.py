@@ -0,0 +1,37 @@
+"""Удаление истёкших сессий из django_session небольшими пачками."""
+import time
+
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = ('Удаляет истёкшие сессии пачками. В отличие от clearsessions '
+            'не держит блокировку записи SQLite на всё удаление: между '
+            'пачками успевают записаться посты и комментарии.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Сколько сессий удалять за один запрос.')
+        parser.add_argument(
+            '--pause', type=float, default=0.05,
+            help='Пауза между пачками, секунды.')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        # Сессии, истёкшие во время очистки, подождут следующего запуска.
+        expired = Session.objects.filter(expire_date__lt=timezone.now())
+        deleted = 0
+        while True:
+            keys = list(expired.values_list(
+                'session_key', flat=True)[:batch_size])
+            if not keys:
+                break
+            deleted += Session.objects.filter(session_key__in=keys).delete()[0]
+            if len(keys) < batch_size:
+                break
+            time.sleep(options['pause'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Удалено истёкших сессий: {deleted}'))
@@ -0,0 +1,33 @@
+"""Потоковая выгрузка содержимого блога."""
+from django.core.management.base import BaseCommand
+
+from blog.constants import EXPORT_CHUNK_SIZE
+from blog.export import EXPORTS, FORMATS
+
+
+class Command(BaseCommand):
+    help = ('Выгружает посты, комментарии, категории или места в JSON Lines '
+            'или CSV, не загружая таблицу в память.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(EXPORTS))
+        parser.add_argument('--format', choices=sorted(FORMATS),
+                            default='jsonl')
+        parser.add_argument('--output', help='Файл; по умолчанию stdout.')
+        parser.add_argument('--chunk-size', type=int,
+                            default=EXPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        lines = FORMATS[options['format']][0](
+            options['kind'], options['chunk_size'])
+        if options['output'] is None:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+        written = 0
+        with open(options['output'], 'w', encoding='utf-8',
+                  newline='') as output:
+            for line in lines:
+                output.write(line)
+                written += 1
+        self.stderr.write(f'Записано строк: {written}')
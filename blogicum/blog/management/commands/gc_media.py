@@ -0,0 +1,60 @@
+"""Удаление блобов, на которые больше не ссылаются модели."""
+import os
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.models import Category, Post
+from blog.storage import (
+    BLOB_DIR,
+    blob_hash,
+    content_addressed_storage,
+    is_blob_name,
+)
+
+
+class Command(BaseCommand):
+    help = ('Удаляет из хранилища блобов файлы и их копии, на которые '
+            'не ссылается ни один пост или категория.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace', type=int, default=60 * 60,
+            help='Не трогать файлы моложе стольких секунд: они могут '
+                 'принадлежать ещё не сохранённой форме.')
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только показать, что будет удалено.')
+
+    def referenced_hashes(self):
+        hashes = set()
+        for model in (Post, Category):
+            names = model.objects.exclude(image='').values_list(
+                'image', flat=True)
+            for name in names.iterator():
+                if is_blob_name(name):
+                    hashes.add(blob_hash(name))
+        return hashes
+
+    def handle(self, *args, **options):
+        root = content_addressed_storage.path(BLOB_DIR)
+        referenced = self.referenced_hashes()
+        deadline = time.time() - options['grace']
+        removed = freed = 0
+        for directory, _, files in os.walk(root):
+            for filename in files:
+                path = os.path.join(directory, filename)
+                if blob_hash(filename) in referenced:
+                    continue
+                stat = os.stat(path)
+                if stat.st_mtime > deadline:
+                    continue
+                removed += 1
+                freed += stat.st_size
+                if options['dry_run']:
+                    self.stdout.write(os.path.relpath(path, root))
+                else:
+                    os.remove(path)
+        verb = 'Будет удалено' if options['dry_run'] else 'Удалено'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} файлов: {removed}, освобождено байт: {freed}'))
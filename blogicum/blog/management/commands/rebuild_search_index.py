@@ -0,0 +1,22 @@
+"""Перестроение поискового индекса постов."""
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from blog.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = ('Заново индексирует все посты для поиска. Нужна после '
+            'загрузки данных в обход сигналов (bulk_create, SQL).')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=2000,
+            help='Сколько постов индексировать за один запрос.')
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        backend = get_search_backend(options['database'])
+        indexed = backend.rebuild(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'{type(backend).__name__}: проиндексировано постов {indexed}'))
@@ -0,0 +1,19 @@
+"""Пересчёт денормализованного счётчика комментариев."""
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from blog.models import Comment, Post
+from blog.querysets import comment_count_subquery
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает Post.comment_count по таблице комментариев.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        updated = Post.objects.using(options['database']).update(
+            comment_count=comment_count_subquery(Comment))
+        self.stdout.write(
+            self.style.SUCCESS(f'Пересчитано публикаций: {updated}'))
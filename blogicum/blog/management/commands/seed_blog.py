@@ -0,0 +1,182 @@
+"""Синтетические данные для нагрузочных замеров."""
+import random
+from itertools import accumulate
+from datetime import timedelta
+from uuid import uuid4
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from blog.caching import (
+    INDEX_FEED,
+    bump_tags,
+    feed_tag,
+    invalidate_feed_caches,
+)
+from blog.lookups import invalidate_lookups
+from blog.models import Category, Comment, Location, Post
+from blog.querysets import comment_count_subquery
+from blog.utils import make_excerpt
+
+
+User = get_user_model()
+
+WORDS = (
+    'горы озеро тропа рассвет палатка костёр маршрут перевал ветер река '
+    'лес поляна закат город улица музей площадь мост вокзал поезд '
+    'дорога море берег волна песок камень небо облако туман дождь '
+    'снег вершина долина карта компас рюкзак привал ночлег утро вечер'
+).split()
+
+
+def _words(rng, low, high):
+    return ' '.join(rng.choices(WORDS, k=rng.randint(low, high)))
+
+
+def _batches(items, size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _max_pk(model):
+    return model.objects.aggregate(pk=Max('pk'))['pk'] or 0
+
+
+class Command(BaseCommand):
+    help = ('Создаёт пользователей, категории, места, посты и комментарии '
+            'пакетными вставками для замеров производительности.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=10_000)
+        parser.add_argument(
+            '--comments', type=float, default=5,
+            help='Среднее число комментариев на пост (распределение '
+                 'экспоненциальное: у немногих постов их очень много).')
+        parser.add_argument('--users', type=int, default=500)
+        parser.add_argument('--categories', type=int, default=20)
+        parser.add_argument('--locations', type=int, default=50)
+        parser.add_argument(
+            '--days', type=int, default=365 * 3,
+            help='За сколько дней распределены даты публикации.')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=None)
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        # Уникальная метка запуска: повторный запуск добавляет данные.
+        self.run = uuid4().hex[:6]
+        users = self.create_users(options['users'])
+        categories = self.create(Category, (
+            Category(
+                title=f'Категория {i} {self.run}',
+                description=_words(self.rng, 10, 30),
+                slug=f'seed-{self.run}-{i}',
+                is_published=self.rng.random() > 0.1,
+            ) for i in range(options['categories'])))
+        locations = self.create(Location, (
+            Location(name=f'Место {i} {self.run}',
+                     is_published=self.rng.random() > 0.1)
+            for i in range(options['locations'])))
+        posts = self.create_posts(
+            options['posts'], options['days'], users, categories, locations)
+        comments = self.create_comments(posts, options['comments'], users)
+        call_command('rebuild_search_index', stdout=self.stdout)
+        invalidate_lookups()
+        invalidate_feed_caches([INDEX_FEED])
+        bump_tags({feed_tag(INDEX_FEED)})
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано: пользователей {len(users)}, категорий '
+            f'{len(categories)}, мест {len(locations)}, постов '
+            f'{len(posts)}, комментариев {comments}'))
+
+    def create(self, model, objects):
+        """Пакетная вставка; возвращает id созданных записей.
+
+        bulk_create в SQLite не возвращает первичные ключи, поэтому
+        новые id берутся как id больше прежнего максимума.
+        """
+        start = _max_pk(model)
+        for batch in _batches(objects, self.batch_size):
+            with transaction.atomic():
+                model.objects.bulk_create(batch)
+        return list(model.objects.filter(pk__gt=start)
+                    .order_by('pk').values_list('pk', flat=True))
+
+    def create_users(self, count):
+        # Один хэш на всех: хэширование пароля — самая медленная часть.
+        password = make_password(None)
+        return self.create(User, (
+            User(username=f'seed_{self.run}_{i}', password=password,
+                 first_name=self.rng.choice(WORDS).title())
+            for i in range(count)))
+
+    def create_posts(self, count, days, users, categories, locations):
+        now = timezone.now()
+        # Как в жизни, немногие авторы и категории дают большую часть
+        # постов: веса по закону Ципфа.
+        author_weights = list(accumulate(
+            1 / rank for rank in range(1, len(users) + 1)))
+        category_weights = list(accumulate(
+            1 / rank for rank in range(1, len(categories) + 1)))
+
+        def posts():
+            for _ in range(count):
+                text = _words(self.rng, 20, 300)
+                pub_date = now - timedelta(
+                    seconds=self.rng.randint(0, days * 24 * 60 * 60))
+                if self.rng.random() < 0.01:
+                    # Отложенная публикация.
+                    pub_date = now + timedelta(
+                        hours=self.rng.randint(1, 24 * 30))
+                yield Post(
+                    title=_words(self.rng, 2, 6).capitalize(),
+                    text=text,
+                    excerpt=make_excerpt(text),
+                    pub_date=pub_date,
+                    author_id=self.rng.choices(
+                        users, cum_weights=author_weights)[0],
+                    category_id=self.rng.choices(
+                        categories, cum_weights=category_weights)[0],
+                    location_id=(self.rng.choice(locations)
+                                 if self.rng.random() > 0.3 else None),
+                    is_published=self.rng.random() > 0.05,
+                )
+
+        return self.create(Post, posts())
+
+    def create_comments(self, posts, mean, users):
+        created = 0
+        if not mean:
+            return created
+        for post_batch in _batches(posts, self.batch_size):
+            counts = {
+                post_id: int(self.rng.expovariate(1 / mean))
+                for post_id in post_batch
+            }
+            comments = (
+                Comment(post_id=post_id, author_id=self.rng.choice(users),
+                        text=_words(self.rng, 3, 60))
+                for post_id, number in counts.items()
+                for _ in range(number)
+            )
+            for batch in _batches(comments, self.batch_size):
+                with transaction.atomic():
+                    Comment.objects.bulk_create(batch)
+                created += len(batch)
+            # Вставка пакетом обходит сигналы, счётчик считается запросом.
+            Post.objects.filter(
+                pk__gte=post_batch[0], pk__lte=post_batch[-1]
+            ).update(comment_count=comment_count_subquery(Comment))
+        return created
@@ -0,0 +1,24 @@
+"""Компиляция всех шаблонов проекта и приложений."""
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.templating import default_engine, is_cached, preload_templates
+
+
+class Command(BaseCommand):
+    help = ('Компилирует все шаблоны так же, как WSGI-процесс при старте: '
+            'проверяет, что они собираются, и показывает время прогрева.')
+
+    def handle(self, *args, **options):
+        engine = default_engine()
+        compiled, errors, elapsed = preload_templates(engine, force=True)
+        for name, error in errors.items():
+            self.stderr.write(f'{name}: {error}')
+        if not is_cached(engine):
+            self.stdout.write(
+                'cached.Loader выключен (BLOG_CACHED_TEMPLATES): '
+                'рабочие процессы будут разбирать шаблоны при каждом '
+                'запросе.')
+        if errors:
+            raise CommandError(f'Не компилируются шаблоны: {len(errors)}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Скомпилировано шаблонов: {compiled} за {elapsed * 1000:.0f} мс'))
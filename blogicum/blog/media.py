@@ -0,0 +1,185 @@
+"""Отдача медиафайлов."""
+import mimetypes
+import os
+import posixpath
+import re
+import stat
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.static import serve
+
+from .constants import MEDIA_IMMUTABLE_MAX_AGE, MEDIA_MAX_AGE
+from .storage import is_blob_name
+from .uploadhandlers import upload_staging_dir
+
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def media_sendfile():
+    """Способ передать файл фронт-серверу.
+
+    'x-sendfile' — Apache/lighttpd, 'x-accel-redirect' — nginx,
+    None — файл отдаёт сам Django.
+    """
+    return getattr(settings, 'BLOG_MEDIA_SENDFILE', None)
+
+
+def media_accel_prefix():
+    """Internal-location nginx, смотрящий в MEDIA_ROOT."""
+    return getattr(settings, 'BLOG_MEDIA_ACCEL_PREFIX', '/protected-media/')
+
+
+def file_etag(stat_result):
+    return f'"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"'
+
+
+def parse_range(header, size):
+    """Границы (start, end) единственного диапазона из заголовка Range.
+
+    None — заголовка нет или он не разобран (отдаётся весь файл),
+    ValueError — диапазон за пределами файла.
+    """
+    match = RANGE_RE.match(header.replace(' ', '')) if header else None
+    if match is None or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if not first:
+        if int(last) == 0:
+            raise ValueError('Пустой диапазон.')
+        return max(0, size - int(last)), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise ValueError('Диапазон вне файла.')
+    return start, min(int(last), size - 1) if last else size - 1
+
+
+class FileRange:
+    """Часть файла для FileResponse: читает не дальше конца диапазона."""
+
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def _range_is_current(request, etag, last_modified):
+    """If-Range: диапазон отдаётся, только если файл не изменился."""
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if not if_range:
+        return True
+    if if_range.startswith(('"', 'W/')):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == last_modified
+
+
+def _cache_control(response, path):
+    if is_blob_name(path):
+        # Блоб и его копии с тем же именем всегда с тем же содержимым.
+        patch_cache_control(response, public=True,
+                            max_age=MEDIA_IMMUTABLE_MAX_AGE, immutable=True)
+    else:
+        patch_cache_control(response, public=True, max_age=MEDIA_MAX_AGE)
+
+
+def _file_headers(path, fullpath, stat_result):
+    """Пустой ответ с заголовками файла для проверки условий запроса."""
+    content_type, encoding = mimetypes.guess_type(fullpath)
+    headers = HttpResponse(
+        content_type=content_type or 'application/octet-stream')
+    headers['ETag'] = file_etag(stat_result)
+    headers['Last-Modified'] = http_date(stat_result.st_mtime)
+    headers['Accept-Ranges'] = 'bytes'
+    if encoding:
+        headers['Content-Encoding'] = encoding
+    _cache_control(headers, path)
+    return headers
+
+
+def _offload(headers, path, fullpath):
+    """Ответ без тела: файл отправит фронт-сервер, или None."""
+    sendfile = media_sendfile()
+    if sendfile == 'x-sendfile':
+        headers['X-Sendfile'] = fullpath
+    elif sendfile == 'x-accel-redirect':
+        headers['X-Accel-Redirect'] = media_accel_prefix() + path
+    else:
+        return None
+    return headers
+
+
+def _file_response(request, fullpath, headers, size):
+    """Файл целиком или запрошенный диапазон."""
+    byte_range = None
+    if _range_is_current(request, headers['ETag'],
+                         parse_http_date_safe(headers['Last-Modified'])):
+        try:
+            byte_range = parse_range(request.META.get('HTTP_RANGE'), size)
+        except ValueError:
+            headers.status_code = 416
+            headers['Content-Range'] = f'bytes */{size}'
+            return headers
+    file = open(fullpath, 'rb')
+    if byte_range is None:
+        response = FileResponse(file, content_type=headers['Content-Type'])
+    else:
+        start, end = byte_range
+        response = FileResponse(FileRange(file, start, end - start + 1),
+                                status=206,
+                                content_type=headers['Content-Type'])
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = end - start + 1
+    for header, value in headers.items():
+        response.headers.setdefault(header, value)
+    return response
+
+
+def serve_media(request, path, document_root=None, show_indexes=False):
+    """Отдаёт медиафайл с поддержкой условных запросов и Range.
+
+    Сами байты по возможности передаёт фронт-сервер
+    (BLOG_MEDIA_SENDFILE), иначе FileResponse — через wsgi.file_wrapper
+    сервер приложений отправит файл вызовом sendfile().
+    """
+    path = posixpath.normpath(path).lstrip('/')
+    fullpath = safe_join(document_root, path)
+    # BLOG_UPLOAD_STAGING_DIR может лежать и внутри MEDIA_ROOT.
+    staging_dir = os.path.realpath(upload_staging_dir())
+    if os.path.commonpath([os.path.realpath(fullpath),
+                           staging_dir]) == staging_dir:
+        raise Http404('Файл не найден.')
+    try:
+        stat_result = os.stat(fullpath)
+    except (FileNotFoundError, NotADirectoryError):
+        raise Http404('Файл не найден.')
+    if stat.S_ISDIR(stat_result.st_mode):
+        if show_indexes:
+            return serve(request, path, document_root, show_indexes)
+        raise Http404('Список файлов каталога недоступен.')
+
+    headers = _file_headers(path, fullpath, stat_result)
+    response = get_conditional_response(
+        request, etag=headers['ETag'],
+        last_modified=int(stat_result.st_mtime), response=headers)
+    if response is not headers:
+        return response
+    offloaded = _offload(headers, path, fullpath)
+    if offloaded is not None:
+        return offloaded
+    return _file_response(request, fullpath, headers, stat_result.st_size)
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.16 on 2026-10-18 20:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0013_post_modified_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.TextField(blank=True, editable=False, help_text='Начало текста для карточки в ленте; заполняется при сохранении и командой backfill_excerpts.', verbose_name='Анонс'),
+        ),
+    ]
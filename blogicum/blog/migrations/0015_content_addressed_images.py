@@ -0,0 +1,24 @@
+# Generated by Django 3.2.16 on 2026-10-18 20:40
+
+import blog.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0014_post_excerpt'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='category',
+            name='image',
+            field=models.ImageField(blank=True, storage=blog.storage.get_media_storage, upload_to='post_images', verbose_name='Фото'),
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='image',
+            field=models.ImageField(blank=True, storage=blog.storage.get_media_storage, upload_to='blog_image', verbose_name='Фото'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+from django.db import migrations
+from django.db.utils import OperationalError
+
+
+SQLITE_TABLE = 'blog_post_search'
+POSTGRES_INDEX = 'blog_post_search_idx'
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'sqlite':
+        try:
+            schema_editor.execute(
+                f'CREATE VIRTUAL TABLE {SQLITE_TABLE} USING fts5('
+                "title, text, tokenize = 'unicode61 remove_diacritics 2')")
+        except OperationalError:
+            # Сборка SQLite без FTS5: поиск работает через icontains.
+            return
+        schema_editor.execute(
+            f'INSERT INTO {SQLITE_TABLE} (rowid, title, text) '
+            'SELECT id, title, text FROM blog_post')
+    elif connection.vendor == 'postgresql':
+        schema_editor.execute(
+            f'CREATE INDEX {POSTGRES_INDEX} ON blog_post USING GIN ('
+            "to_tsvector('russian', coalesce(title, '') || ' ' || "
+            "coalesce(text, '')))")
+
+
+def drop_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {SQLITE_TABLE}')
+    elif connection.vendor == 'postgresql':
+        schema_editor.execute(f'DROP INDEX IF EXISTS {POSTGRES_INDEX}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0015_content_addressed_images'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
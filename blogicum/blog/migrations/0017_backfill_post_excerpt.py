@@ -0,0 +1,31 @@
+from django.db import migrations
+
+from blog.utils import make_excerpt
+
+
+def fill_excerpts(apps, schema_editor):
+    # То же, что backfill_excerpts: без анонса карточка в ленте
+    # загружала бы отложенный text отдельным запросом.
+    Post = apps.get_model('blog', 'Post')
+    manager = Post.objects.using(schema_editor.connection.alias)
+    posts = manager.filter(excerpt='').only('id', 'text').order_by('pk')
+    batch = []
+    for post in posts.iterator(chunk_size=1000):
+        post.excerpt = make_excerpt(post.text)
+        batch.append(post)
+        if len(batch) == 1000:
+            manager.bulk_update(batch, ['excerpt'])
+            batch = []
+    if batch:
+        manager.bulk_update(batch, ['excerpt'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0016_post_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_excerpts, migrations.RunPython.noop),
+    ]
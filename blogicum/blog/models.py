@@ -1,20 +1,50 @@
 """Модели проекта"""
-from django.db import models
+import threading
+from contextlib import contextmanager
+
+from django.db import models, router
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 
 from blog.constants import MAX_LENGTH_TEXT
+from blog.routes import blog_url
+from blog.storage import get_media_storage
+from blog.utils import make_excerpt
 
 
 User = get_user_model()
 
+# Посты, которые удаляются в этом потоке прямо сейчас: (база, id).
+_deleting = threading.local()
+
+
+def deleting_posts():
+    if not hasattr(_deleting, 'posts'):
+        _deleting.posts = set()
+    return _deleting.posts
+
+
+@contextmanager
+def _deleting_post(using, pk):
+    key = (using, pk)
+    deleting_posts().add(key)
+    try:
+        yield
+    finally:
+        deleting_posts().discard(key)
+
 
 class Category(models.Model):
     """Модель категории"""
 
     title = models.CharField('Заголовок', max_length=MAX_LENGTH_TEXT)
     description = models.TextField('Описание')
-    image = models.ImageField('Фото', upload_to='post_images', blank=True)
+    image = models.ImageField(
+        'Фото',
+        upload_to='post_images',
+        storage=get_media_storage,
+        blank=True
+    )
     slug = models.SlugField(
         'Идентификатор',
         unique=True,
@@ -57,6 +87,13 @@ class Post(models.Model):
 
     title = models.CharField('Заголовок', max_length=MAX_LENGTH_TEXT)
     text = models.TextField('Текст')
+    excerpt = models.TextField(
+        'Анонс',
+        blank=True,
+        editable=False,
+        help_text='Начало текста для карточки в ленте; заполняется '
+                  'при сохранении и командой backfill_excerpts.'
+    )
     pub_date = models.DateTimeField(
         'Дата и время публикации',
         help_text='Если установить дату и время в будущем — '
@@ -83,17 +120,94 @@ class Post(models.Model):
         verbose_name='Категория'
     )
     created_at = models.DateTimeField('Добавлено', auto_now_add=True)
+    modified_at = models.DateTimeField('Изменено', auto_now=True)
     is_published = models.BooleanField('Опубликовано', default=True)
-    image = models.ImageField('Фото', upload_to='blog_image', blank=True)
+    image = models.ImageField(
+        'Фото',
+        upload_to='blog_image',
+        storage=get_media_storage,
+        blank=True
+    )
+    comment_count = models.PositiveIntegerField(
+        'Комментариев',
+        default=0,
+        editable=False,
+        help_text='Поддерживается сигналами комментариев; '
+                  'пересчитывается командой recount_comments.'
+    )
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         ordering = ('-pub_date',)
+        # Индексы повторяют фильтры и сортировку из blog/querysets.py:
+        # опубликованные посты ленты, категории и все посты автора.
+        indexes = (
+            models.Index(
+                fields=('-pub_date', '-id'),
+                condition=models.Q(is_published=True),
+                name='post_feed_idx',
+            ),
+            models.Index(
+                fields=('category', '-pub_date', '-id'),
+                condition=models.Q(is_published=True),
+                name='post_category_feed_idx',
+            ),
+            models.Index(
+                fields=('author', '-pub_date', '-id'),
+                name='post_author_feed_idx',
+            ),
+        )
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        # Без text в update_fields анонс не меняется, а отложенный
+        # text не нужно загружать.
+        if update_fields is None or 'text' in update_fields:
+            self.excerpt = make_excerpt(self.text)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'excerpt'}
+        super().save(*args, **kwargs)
+
+    def delete(self, using=None, keep_parents=False):
+        # Комментарии удаляются каскадом: счётчик им менять незачем.
+        using = using or router.db_for_write(type(self), instance=self)
+        with _deleting_post(using, self.pk):
+            return super().delete(using, keep_parents)
 
     def get_absolute_url(self):
         return reverse('blog:profile', args=[self.author])
 
+    @property
+    def detail_url(self):
+        return blog_url('blog:post_detail', self.pk)
+
+    @property
+    def author_url(self):
+        return blog_url('blog:profile', self.author.username)
+
+    @property
+    def category_url(self):
+        return blog_url('blog:category_posts', self.category.slug)
+
+    @property
+    def card_version(self):
+        """Версия карточки поста для кэша фрагментов.
+
+        Кроме самого поста, карточка выводит число комментариев,
+        автора, категорию и место — их изменения тоже меняют версию.
+        """
+        category = self.category
+        location = self.location
+        return (
+            self.modified_at.timestamp(),
+            self.comment_count,
+            self.author.username,
+            category and (category.slug, category.title,
+                          category.is_published),
+            location and (location.name, location.is_published),
+        )
+
     def __str__(self):
         return self.title
 
@@ -112,6 +226,24 @@ class Comment(models.Model):
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
         ordering = ('created_at',)
+        indexes = (
+            models.Index(
+                fields=('post', 'created_at', 'id'),
+                name='comment_post_created_idx',
+            ),
+        )
 
     def __str__(self):
         return (self.text)
+
+    @property
+    def author_url(self):
+        return blog_url('blog:profile', self.author.username)
+
+    @property
+    def edit_url(self):
+        return blog_url('blog:edit_comment', self.post_id, self.pk)
+
+    @property
+    def delete_url(self):
+        return blog_url('blog:delete_comment', self.post_id, self.pk)
@@ -0,0 +1,205 @@
+"""Замер SQL и отрисовки шаблонов для каждого запроса.
+
+ProfilingMiddleware профилирует долю запросов BLOG_PROFILING_SAMPLE_RATE
+и все запросы с BLOG_PROFILING_IPS (при DEBUG — и с INTERNAL_IPS) или
+от персонала (кроме медиафайлов). Последним результаты отдаются
+в заголовке Server-Timing; сводка по view — в profiling_stats.
+"""
+import random
+import threading
+from collections import defaultdict, deque
+from contextlib import ExitStack
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connections
+from django.template.base import Template
+
+from .constants import PROFILING_TOP_TEMPLATES, PROFILING_WINDOW
+from .utils import percentile
+
+
+_local = threading.local()
+_original_render = None
+
+
+def _profiled_render(self, context):
+    profile = getattr(_local, 'profile', None)
+    if profile is None:
+        return _original_render(self, context)
+    return profile.render(_original_render, self, context)
+
+
+def install_template_timing():
+    """Оборачивает Template._render; без активного замера — один getattr."""
+    global _original_render
+    if Template._render is not _profiled_render:
+        _original_render = Template._render
+        Template._render = _profiled_render
+
+
+def sample_rate():
+    return getattr(settings, 'BLOG_PROFILING_SAMPLE_RATE', 0.0)
+
+
+class RequestProfile:
+    """Запросы к базе и собственное время каждого шаблона.
+
+    Время шаблона не включает вложенные шаблоны, но включает
+    запросы, выполненные при его отрисовке (ленивые queryset).
+    """
+
+    def __init__(self):
+        self.queries = 0
+        self.sql = 0.0
+        self.templates = {}
+        self._children = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql += perf_counter() - start
+            self.queries += 1
+
+    def render(self, render, template, context):
+        self._children.append(0.0)
+        start = perf_counter()
+        try:
+            return render(template, context)
+        finally:
+            elapsed = perf_counter() - start
+            own = elapsed - self._children.pop()
+            if self._children:
+                self._children[-1] += elapsed
+            name = (template.origin.template_name or template.name
+                    or '<string>')
+            count, total = self.templates.get(name, (0, 0.0))
+            self.templates[name] = (count + 1, total + own)
+
+    def top_templates(self):
+        return sorted(self.templates.items(),
+                      key=lambda item: item[1][1],
+                      reverse=True)[:PROFILING_TOP_TEMPLATES]
+
+
+class ProfileStats:
+    """Последние PROFILING_WINDOW замеров каждого view в памяти процесса."""
+
+    def __init__(self, window=PROFILING_WINDOW):
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples = defaultdict(lambda: deque(maxlen=self.window))
+
+    def add(self, view_name, duration, profile):
+        sample = (duration, profile.queries, profile.sql, profile.templates)
+        with self._lock:
+            self._samples[view_name].append(sample)
+
+    def clear(self):
+        with self._lock:
+            self._samples.clear()
+
+    def summary(self):
+        with self._lock:
+            samples = {name: list(items)
+                       for name, items in self._samples.items()}
+        return {name: self._summarize(items)
+                for name, items in sorted(samples.items())}
+
+    @staticmethod
+    def _summarize(samples):
+        count = len(samples)
+        durations = [sample[0] * 1000 for sample in samples]
+        templates = defaultdict(float)
+        for *_, sample_templates in samples:
+            for name, (_, total) in sample_templates.items():
+                templates[name] += total
+        return {
+            'requests': count,
+            'p50_ms': round(percentile(durations, 50), 2),
+            'p95_ms': round(percentile(durations, 95), 2),
+            'queries': round(sum(s[1] for s in samples) / count, 2),
+            'sql_ms': round(sum(s[2] for s in samples) * 1000 / count, 2),
+            'templates_ms': {
+                name: round(total * 1000 / count, 2)
+                for name, total in sorted(
+                    templates.items(), key=lambda item: item[1],
+                    reverse=True)[:PROFILING_TOP_TEMPLATES]
+            },
+        }
+
+
+profile_stats = ProfileStats()
+
+
+def _description(text):
+    return str(text).replace('\\', '/').replace('"', "'")
+
+
+def server_timing(duration, profile):
+    """Значение заголовка Server-Timing, длительности в миллисекундах."""
+    metrics = [
+        f'db;dur={profile.sql * 1000:.2f};desc="SQL x{profile.queries}"',
+        f'tpl;dur={sum(t for _, t in profile.templates.values()) * 1000:.2f}'
+        ';desc="Templates"',
+    ]
+    for number, (name, (count, total)) in enumerate(
+            profile.top_templates(), 1):
+        metrics.append(f'tpl{number};dur={total * 1000:.2f};'
+                       f'desc="{_description(name)} x{count}"')
+    metrics.append(f'view;dur={duration * 1000:.2f}')
+    return ', '.join(metrics)
+
+
+class ProfilingMiddleware:
+    """Ставится после AuthenticationMiddleware."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        install_template_timing()
+
+    def __call__(self, request):
+        if not self.should_profile(request):
+            return self.get_response(request)
+        profile = _local.profile = RequestProfile()
+        start = perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(profile))
+                response = self.get_response(request)
+        finally:
+            _local.profile = None
+        duration = perf_counter() - start
+        match = request.resolver_match
+        if match is not None:
+            profile_stats.add(match.view_name, duration, profile)
+        if self.show_timing(request):
+            response['Server-Timing'] = server_timing(duration, profile)
+        return response
+
+    def should_profile(self, request):
+        rate = sample_rate()
+        return (
+            rate and random.random() < rate
+            or self.show_timing(request)
+        )
+
+    @staticmethod
+    def show_timing(request):
+        # За локальным прокси у всех запросов REMOTE_ADDR = 127.0.0.1,
+        # поэтому INTERNAL_IPS учитываются только при DEBUG.
+        address = request.META.get('REMOTE_ADDR')
+        if address in getattr(settings, 'BLOG_PROFILING_IPS', ()):
+            return True
+        if settings.DEBUG and address in settings.INTERNAL_IPS:
+            return True
+        # request.user читает сессию и пользователя из базы и добавляет
+        # Vary: Cookie; медиафайлам это ни к чему.
+        if (not hasattr(request, '_cached_user')
+                and request.path.startswith(settings.MEDIA_URL)):
+            return False
+        user = getattr(request, 'user', None)
+        return user is not None and user.is_staff
@@ -1,5 +1,8 @@
 from django.utils import timezone
-from django.db.models import Count
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .lookups import with_cached_relations
 
 
 def apply_publication_filters(queryset):
@@ -15,7 +18,70 @@ def apply_publication_filters(queryset):
     )
 
 
-def apply_publication_annotat(queryset):
-    """Реализация аннотаций на кварисеты."""
-    return queryset.annotate(
-        comment_count=Count('comments')).order_by('-pub_date')
+def apply_publication_ordering(queryset):
+    """Сортировка ленты: сначала новые публикации.
+
+    Число комментариев хранится в Post.comment_count, поэтому
+    агрегировать комментарии в запросе ленты не нужно.
+    """
+    return queryset.order_by('-pub_date', '-id')
+
+
+FEED_FIELDS = (
+    'title',
+    'excerpt',
+    'pub_date',
+    'image',
+    'is_published',
+    'comment_count',
+    'modified_at',
+    'author',
+    'category',
+    'location',
+)
+
+
+def apply_feed_fields(queryset):
+    """Только поля, которые выводит карточка поста.
+
+    Текст поста в ленту не попадает; автор, категория и место
+    подставляются из кэша (blog.lookups), без JOIN.
+    """
+    return with_cached_relations(
+        queryset.select_related(None)
+    ).only(*FEED_FIELDS)
+
+
+DETAIL_FIELDS = (
+    'title',
+    'text',
+    'pub_date',
+    'image',
+    'is_published',
+    'author',
+    'category',
+    'location',
+    'author__username',
+    'category__title',
+    'category__slug',
+    'category__is_published',
+    'location__name',
+    'location__is_published',
+)
+
+
+def apply_detail_fields(queryset):
+    """Пост со всем, что выводит его страница, одним запросом."""
+    return queryset.select_related(
+        'category',
+        'location',
+        'author',
+    ).only(*DETAIL_FIELDS)
+
+
+def comment_count_subquery(comment_model):
+    """Подзапрос с фактическим числом комментариев поста."""
+    counts = comment_model.objects.filter(
+        post=OuterRef('pk')
+    ).order_by().values('post').annotate(total=Count('pk')).values('total')
+    return Coalesce(Subquery(counts), 0)
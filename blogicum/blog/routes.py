@@ -0,0 +1,131 @@
+"""Построение URL блога по заранее собранным шаблонам маршрутов.
+
+reverse() на каждый вызов обходит резолвер, подбирает вариант маршрута
+и проверяет аргументы регулярным выражением. Здесь каждый маршрут
+пространства имён blog один раз разворачивается с метками вместо
+аргументов, дальше URL — подстановка в строку.
+
+Значения не проверяются регулярным выражением маршрута: передавать
+нужно то, что хранит модель (id, slug, имя пользователя). URLconf —
+всегда ROOT_URLCONF, request.urlconf не учитывается.
+"""
+import threading
+from functools import lru_cache
+from urllib.parse import quote
+
+from django.core.signals import request_finished, request_started
+from django.dispatch import receiver
+from django.urls import (
+    NoReverseMatch,
+    get_resolver,
+    get_script_prefix,
+    reverse,
+)
+from django.urls.converters import IntConverter
+
+
+NAMESPACE = 'blog'
+# Символы, которые reverse() оставляет в пути без экранирования.
+SAFE_CHARS = "!$&'()*+,;=/~:@"
+
+_request_prefix = threading.local()
+
+
+@receiver(request_started)
+def _remember_script_prefix(sender, **kwargs):
+    # get_script_prefix() читает asgiref.Local, это дороже самой
+    # подстановки; обработчик запроса задаёт префикс перед сигналом.
+    _request_prefix.value = get_script_prefix()
+
+
+@receiver(request_finished)
+def _forget_script_prefix(sender, **kwargs):
+    _request_prefix.value = None
+
+
+def script_prefix():
+    return getattr(_request_prefix, 'value', None) or get_script_prefix()
+
+
+def _encode(value):
+    value = str(value)
+    if value.isascii() and value.isalnum():
+        return value
+    return quote(value, safe=SAFE_CHARS)
+
+
+class Route:
+    """Шаблон пути без SCRIPT_NAME и конвертеры его аргументов."""
+
+    __slots__ = ('template', 'params', 'converters')
+
+    def __init__(self, template, params, converters):
+        self.template = template
+        self.params = params
+        self.converters = converters
+
+    def accepts(self, args, kwargs):
+        if args:
+            return not kwargs and len(args) == len(self.params)
+        return kwargs.keys() == set(self.params)
+
+    def url(self, *args, **kwargs):
+        if args:
+            kwargs = dict(zip(self.params, args))
+        values = {
+            name: _encode(self.converters[name].to_url(value))
+            for name, value in kwargs.items()
+        }
+        return script_prefix() + self.template.format_map(values)
+
+
+def _placeholder(index, converter):
+    if isinstance(converter, IntConverter):
+        return str(7_000_000_000_000 + index)
+    return f'routeparam{index}x'
+
+
+def _compile(name, params, converters):
+    placeholders = {
+        param: _placeholder(index, converters.get(param))
+        for index, param in enumerate(params)
+    }
+    try:
+        path = reverse(f'{NAMESPACE}:{name}', kwargs=placeholders)
+    except NoReverseMatch:
+        return None
+    path = path[len(get_script_prefix()):]
+    for param, placeholder in placeholders.items():
+        if path.count(placeholder) != 1:
+            return None
+        path = path.replace(placeholder, f'{{{param}}}')
+    return Route(path, params, converters)
+
+
+@lru_cache(maxsize=None)
+def _routes(resolver):
+    """Маршруты по имени; новый резолвер (смена URLconf) — новый набор."""
+    _, namespace_resolver = resolver.namespace_dict[NAMESPACE]
+    routes = {}
+    for name in namespace_resolver.reverse_dict:
+        if not isinstance(name, str):
+            continue
+        candidates = namespace_resolver.reverse_dict.getlist(name)
+        # Несколько вариантов маршрута с одним именем выбирает reverse().
+        if len(candidates) != 1 or len(candidates[0][0]) != 1:
+            continue
+        (_, params), = candidates[0][0]
+        route = _compile(name, tuple(params), candidates[0][3])
+        if route is not None:
+            routes[name] = route
+    return routes
+
+
+def blog_url(view_name, *args, **kwargs):
+    """То же, что reverse(view_name, args=args, kwargs=kwargs)."""
+    namespace, _, name = view_name.rpartition(':')
+    if namespace == NAMESPACE:
+        route = _routes(get_resolver()).get(name)
+        if route is not None and route.accepts(args, kwargs):
+            return route.url(*args, **kwargs)
+    return reverse(view_name, args=args, kwargs=kwargs)
@@ -0,0 +1,175 @@
+"""Полнотекстовый поиск по постам.
+
+Бэкенд задаётся настройкой BLOG_SEARCH_BACKEND (путь к классу);
+по умолчанию выбирается по СУБД: SQLite — таблица FTS5,
+PostgreSQL — GIN-индекс по tsvector, остальные — icontains.
+"""
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Q
+from django.utils.module_loading import import_string
+
+
+# Запрос разбивается на слова; операторы FTS из ввода не принимаются.
+MAX_QUERY_WORDS = 10
+WORD_RE = re.compile(r'\w+')
+
+
+def query_words(query):
+    return WORD_RE.findall(query.lower())[:MAX_QUERY_WORDS]
+
+
+class SimpleSearchBackend:
+    """Поиск без индекса: каждое слово в заголовке или тексте.
+
+    LIKE в SQLite не различает регистр только для латиницы.
+    """
+
+    def __init__(self, using='default'):
+        self.using = using
+
+    def search(self, queryset, query):
+        for word in query_words(query):
+            queryset = queryset.filter(
+                Q(title__icontains=word) | Q(text__icontains=word))
+        return queryset.order_by('-pub_date', '-id')
+
+    def index(self, post):
+        pass
+
+    def remove(self, post_id):
+        pass
+
+    def rebuild(self, batch_size=2000):
+        return 0
+
+
+class SqliteFTSBackend(SimpleSearchBackend):
+    """Обратный индекс SQLite FTS5 с ранжированием bm25.
+
+    Таблица blog_post_search создаётся миграцией 0016; rowid строки
+    индекса — id поста. Заголовок весит больше текста.
+    """
+
+    table = 'blog_post_search'
+    weights = (10.0, 1.0)
+
+    @staticmethod
+    def match_expression(query):
+        # Каждое слово — отдельная фраза с поиском по префиксу:
+        # «горн» найдёт «горные», кавычки и операторы экранированы.
+        return ' '.join(f'"{word}"*' for word in query_words(query))
+
+    def search(self, queryset, query):
+        expression = self.match_expression(query)
+        if not expression:
+            return queryset.none()
+        weights = ', '.join(map(str, self.weights))
+        return queryset.extra(
+            tables=[self.table],
+            where=[f'{self.table}.rowid = blog_post.id',
+                   f'{self.table} MATCH %s'],
+            params=[expression],
+            select={'search_rank': f'bm25({self.table}, {weights})'},
+            order_by=['search_rank', '-pub_date', '-id'],
+        )
+
+    def index(self, post):
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {self.table} WHERE rowid = %s', [post.pk])
+            cursor.execute(
+                f'INSERT INTO {self.table} (rowid, title, text) '
+                'VALUES (%s, %s, %s)', [post.pk, post.title, post.text])
+
+    def remove(self, post_id):
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {self.table} WHERE rowid = %s', [post_id])
+
+    def rebuild(self, batch_size=2000):
+        from .models import Post
+
+        rows = Post.objects.using(self.using).order_by('pk').values_list(
+            'pk', 'title', 'text').iterator(chunk_size=batch_size)
+        indexed = 0
+        # Одна транзакция: в режиме autocommit каждая строка
+        # фиксировалась бы на диске отдельно.
+        with transaction.atomic(using=self.using), \
+                connections[self.using].cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table}')
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) == batch_size:
+                    self._insert(cursor, batch)
+                    indexed += len(batch)
+                    batch = []
+            self._insert(cursor, batch)
+            indexed += len(batch)
+            cursor.execute(
+                f"INSERT INTO {self.table} ({self.table}) VALUES ('optimize')")
+        return indexed
+
+    def _insert(self, cursor, rows):
+        if rows:
+            cursor.executemany(
+                f'INSERT INTO {self.table} (rowid, title, text) '
+                'VALUES (%s, %s, %s)', rows)
+
+
+class PostgresSearchBackend(SimpleSearchBackend):
+    """tsvector по заголовку и тексту с GIN-индексом blog_post_search_idx.
+
+    Выражение document совпадает с выражением индекса из миграции 0016,
+    иначе планировщик индекс не использует.
+    """
+
+    config = 'russian'
+    document = (
+        "to_tsvector('russian', coalesce(blog_post.title, '') || ' ' || "
+        "coalesce(blog_post.text, ''))"
+    )
+
+    def search(self, queryset, query):
+        words = query_words(query)
+        if not words:
+            return queryset.none()
+        tsquery = ' & '.join(f'{word}:*' for word in words)
+        return queryset.extra(
+            where=[f"{self.document} @@ to_tsquery('{self.config}', %s)"],
+            params=[tsquery],
+            select={'search_rank': (
+                f"ts_rank({self.document}, "
+                f"to_tsquery('{self.config}', %s))")},
+            select_params=[tsquery],
+            order_by=['-search_rank', '-pub_date', '-id'],
+        )
+
+
+VENDOR_BACKENDS = {
+    'sqlite': SqliteFTSBackend,
+    'postgresql': PostgresSearchBackend,
+}
+
+
+@lru_cache(maxsize=None)
+def fts_available(using, database_name):
+    """Создана ли таблица FTS5 (модуль fts5 есть не в каждой сборке)."""
+    return (SqliteFTSBackend.table
+            in connections[using].introspection.table_names())
+
+
+def get_search_backend(using='default'):
+    path = getattr(settings, 'BLOG_SEARCH_BACKEND', None)
+    if path:
+        return import_string(path)(using)
+    connection = connections[using]
+    backend = VENDOR_BACKENDS.get(connection.vendor, SimpleSearchBackend)
+    if backend is SqliteFTSBackend and not fts_available(
+            using, str(connection.settings_dict['NAME'])):
+        backend = SimpleSearchBackend
+    return backend(using)
@@ -0,0 +1,216 @@
+"""Сессии в кэше с отложенной записью в базу.
+
+Подключаются как SESSION_ENGINE = 'blog.sessions'. Сессия читается
+и пишется через общий кэш (SESSION_CACHE_ALIAS), как
+в django.contrib.sessions.backends.cache. Изменённые сессии копятся
+в буфере процесса и после запроса записываются в django_session
+пачкой — не позже SESSION_FLUSH_INTERVAL секунд. База нужна, только
+если кэш потерял сессию: после перезапуска или вытеснения.
+
+Удаление (выход, cycle_key при входе) пишется в базу сразу и
+оставляет в общем кэше метку: буферы других процессов могли ещё не
+записать сессию, и без метки она ожила бы из буфера или из строки,
+записанной после удаления. Кэш поэтому должен быть общим для всех
+процессов (проверка blog.E001).
+"""
+import logging
+import threading
+from contextlib import contextmanager
+from time import monotonic
+
+from django.conf import settings
+from django.contrib.sessions.backends.base import CreateError, UpdateError
+from django.contrib.sessions.backends.cached_db import (
+    SessionStore as CachedDBStore,
+)
+from django.core.cache import caches
+from django.core.signals import request_finished
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, transaction
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .constants import SESSION_FLUSH_BATCH, SESSION_FLUSH_INTERVAL
+
+KEY_PREFIX = 'blog.sessions'
+DELETED_KEY_PREFIX = 'blog.sessions.deleted'
+
+logger = logging.getLogger(__name__)
+
+
+class PendingSessions:
+    """Сессии процесса, ещё не записанные в базу: ключ → (данные, срок)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._rows = {}
+        self._since = None
+
+    def __len__(self):
+        return len(self._rows)
+
+    def add(self, session_key, session_data, expire_date):
+        with self._lock:
+            self._rows[session_key] = (session_data, expire_date)
+            if self._since is None:
+                self._since = monotonic()
+
+    def get(self, session_key):
+        return self._rows.get(session_key)
+
+    @contextmanager
+    def removing(self, session_key):
+        """Пока строка удаляется из базы, сброс буфера ждёт.
+
+        Иначе сброс, взявший сессию до удаления, вернул бы строку.
+        """
+        with self._flush_lock:
+            self.discard(session_key)
+            yield
+
+    def discard(self, session_key):
+        with self._lock:
+            self._rows.pop(session_key, None)
+
+    def clear(self):
+        with self._lock:
+            self._rows.clear()
+            self._since = None
+
+    def due(self):
+        since = self._since
+        return since is not None and (
+            len(self._rows) >= SESSION_FLUSH_BATCH
+            or monotonic() - since >= SESSION_FLUSH_INTERVAL)
+
+    def _take(self):
+        with self._lock:
+            rows, self._rows, self._since = self._rows, {}, None
+        return rows
+
+    def _restore(self, rows):
+        # Сессия, сохранённая во время неудачного сброса, новее.
+        with self._lock:
+            for session_key, row in rows.items():
+                self._rows.setdefault(session_key, row)
+            if self._rows and self._since is None:
+                self._since = monotonic()
+
+    def flush(self, using=DEFAULT_DB_ALIAS):
+        """Записывает буфер в базу; возвращает число сессий."""
+        model = SessionStore.get_model_class()
+        with self._flush_lock:
+            rows = self._take()
+            now = timezone.now()
+            deleted = deleted_sessions(rows)
+            sessions = [
+                model(session_key=session_key, session_data=data,
+                      expire_date=expire_date)
+                for session_key, (data, expire_date) in rows.items()
+                if expire_date > now and session_key not in deleted
+            ]
+            if not sessions:
+                return 0
+            try:
+                # Django 3.2 не умеет INSERT ... ON CONFLICT в bulk_create:
+                # старые строки удаляются в той же транзакции.
+                with transaction.atomic(using=using):
+                    manager = model._default_manager.using(using)
+                    manager.filter(
+                        session_key__in=[s.session_key for s in sessions]
+                    ).delete()
+                    manager.bulk_create(sessions, SESSION_FLUSH_BATCH)
+            except DatabaseError as error:
+                self._restore(rows)
+                logger.warning('Сессии не записаны в базу: %s', error)
+                return 0
+        return len(sessions)
+
+
+pending_sessions = PendingSessions()
+
+
+def _deleted_key(session_key):
+    return DELETED_KEY_PREFIX + session_key
+
+
+def session_cache():
+    return caches[settings.SESSION_CACHE_ALIAS]
+
+
+def mark_deleted(session_key):
+    # Метка живёт не меньше самой долгой сессии.
+    session_cache().set(_deleted_key(session_key), True,
+                        settings.SESSION_COOKIE_AGE)
+
+
+def deleted_sessions(session_keys):
+    """Ключи из session_keys, удалённые в каком-либо процессе."""
+    keys = {_deleted_key(key): key for key in session_keys}
+    if not keys:
+        return set()
+    return {keys[key] for key in session_cache().get_many(keys)}
+
+
+@receiver(request_finished)
+def _flush_pending_sessions(sender, **kwargs):
+    # Ответ уже отдан: запись в базу не задерживает запрос.
+    if pending_sessions.due():
+        pending_sessions.flush()
+
+
+class SessionStore(CachedDBStore):
+    """Кэш — основное хранилище, база — отложенная копия."""
+
+    cache_key_prefix = KEY_PREFIX
+
+    def _is_deleted(self, session_key):
+        if self._cache.get(_deleted_key(session_key)) is None:
+            return False
+        pending_sessions.discard(session_key)
+        return True
+
+    def _get_session_from_db(self):
+        if self._is_deleted(self.session_key):
+            self._session_key = None
+            return None
+        # Сессия, вытесненная из кэша до записи в базу, ещё в буфере.
+        row = pending_sessions.get(self.session_key)
+        if row is not None and row[1] > timezone.now():
+            return self.model(session_key=self.session_key,
+                              session_data=row[0], expire_date=row[1])
+        return super()._get_session_from_db()
+
+    def exists(self, session_key):
+        if not session_key or self._is_deleted(session_key):
+            return False
+        return (pending_sessions.get(session_key) is not None
+                or super().exists(session_key))
+
+    def save(self, must_create=False):
+        """Как у backends.cache; ключ проверяется на уникальность по кэшу."""
+        if self.session_key is None:
+            return self.create()
+        data = self._get_session(no_load=must_create)
+        if must_create:
+            if not self._cache.add(self.cache_key, data,
+                                   self.get_expiry_age()):
+                raise CreateError
+        else:
+            self._cache.set(self.cache_key, data, self.get_expiry_age())
+            # Проверка после записи: выход в другом процессе ставит
+            # метку до того, как удалить сессию из кэша.
+            if self._is_deleted(self.session_key):
+                self._cache.delete(self.cache_key)
+                raise UpdateError
+        pending_sessions.add(self.session_key, self.encode(data),
+                             self.get_expiry_date())
+
+    def delete(self, session_key=None):
+        if session_key is None:
+            if self.session_key is None:
+                return
+            session_key = self.session_key
+        mark_deleted(session_key)
+        with pending_sessions.removing(session_key):
+            super().delete(session_key)
@@ -0,0 +1,132 @@
+"""Обработчики сигналов моделей блога."""
+from django.contrib.auth import get_user_model
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .caching import (
+    INDEX_FEED,
+    bump_tags,
+    category_feed,
+    feed_tag,
+    invalidate_feed_caches,
+    post_feeds,
+)
+from .lookups import authors, categories, locations
+from .models import Category, Comment, Location, Post, deleting_posts
+from .search import get_search_backend
+
+
+User = get_user_model()
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_feeds(sender, instance, raw, **kwargs):
+    """Запоминает ленты, в которых пост был до сохранения."""
+    instance._previous_feeds = []
+    if raw or instance.pk is None:
+        return
+    previous = sender.objects.filter(pk=instance.pk).values(
+        'author_id', 'category_id').first()
+    if previous is not None:
+        instance._previous_feeds = post_feeds(sender(**previous))
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_feeds(sender, instance, using, **kwargs):
+    """Сбрасывает счётчики и страницы лент, затронутых постом."""
+    feeds = set(post_feeds(instance))
+    feeds.update(getattr(instance, '_previous_feeds', []))
+    invalidate_feed_caches(feeds)
+    bump_tags({feed_tag(feed) for feed in feeds} | {f'post:{instance.pk}'},
+              using)
+
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, using, update_fields, **kwargs):
+    """Обновляет поисковый индекс, если изменился заголовок или текст."""
+    if update_fields is not None and not {'title', 'text'} & update_fields:
+        return
+    get_search_backend(using).index(instance)
+
+
+@receiver(post_delete, sender=Post)
+def unindex_post(sender, instance, using, **kwargs):
+    get_search_backend(using).remove(instance.pk)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_feeds(sender, instance, using, **kwargs):
+    """Снятие категории с публикации меняет состав главной ленты."""
+    categories.invalidate(using)
+    feeds = [INDEX_FEED, category_feed(instance.pk)]
+    invalidate_feed_caches(feeds)
+    bump_tags({feed_tag(feed) for feed in feeds}
+              | {f'category:{instance.pk}'}, using)
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_location_pages(sender, instance, using, **kwargs):
+    locations.invalidate(using)
+    bump_tags({f'location:{instance.pk}'}, using)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_author_pages(sender, instance, using, **kwargs):
+    """Имя автора выводится в карточках постов и комментариях."""
+    if kwargs.get('update_fields') == frozenset({'last_login'}):
+        return
+    authors.invalidate(instance, using)
+    bump_tags({f'author:{instance.pk}'}, using)
+
+
+def _change_comment_count(post_id, delta, using):
+    if post_id is None:
+        return
+    posts = Post.objects.using(using).filter(pk=post_id)
+    if delta < 0:
+        posts = posts.filter(comment_count__gt=0)
+    posts.update(comment_count=F('comment_count') + delta)
+
+
+@receiver(pre_save, sender=Comment)
+def remember_comment_post(sender, instance, raw, using, **kwargs):
+    """Запоминает пост комментария до сохранения: его могут перенести."""
+    instance._previous_post_id = None
+    if raw or instance.pk is None:
+        return
+    instance._previous_post_id = sender.objects.using(using).filter(
+        pk=instance.pk).values_list('post_id', flat=True).first()
+
+
+@receiver(post_save, sender=Comment)
+def update_comment_count(sender, instance, created, raw, using, **kwargs):
+    """Меняет счётчики комментариев постов одним UPDATE на пост."""
+    previous = None if created else getattr(
+        instance, '_previous_post_id', instance.post_id)
+    if not raw and (created or previous != instance.post_id):
+        _change_comment_count(previous, -1, using)
+        _change_comment_count(instance.post_id, 1, using)
+    bump_tags({f'post:{pk}' for pk in (previous, instance.post_id)
+               if pk is not None}, using)
+
+
+def _is_cascaded(comment, using):
+    # Пост удаляется через Post.delete(): его счётчик и кэш уходят
+    # вместе с ним. При массовом удалении постов счётчик просто
+    # уменьшается у уже удалённой строки.
+    return (using, comment.post_id) in deleting_posts()
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_count(sender, instance, using, **kwargs):
+    """Уменьшает счётчик, в том числе при массовом удалении из админки."""
+    if _is_cascaded(instance, using):
+        return
+    _change_comment_count(instance.post_id, -1, using)
+    if instance.post_id is not None:
+        bump_tags({f'post:{instance.post_id}'}, using)
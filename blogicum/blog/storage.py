@@ -0,0 +1,67 @@
+"""Хранилище медиафайлов с адресацией по содержимому."""
+import hashlib
+import os
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+
+
+# Каталог блобов внутри MEDIA_ROOT: cas/ab/abcdef....jpg
+BLOB_DIR = 'cas'
+
+
+def is_blob_name(name):
+    """Имя файла в хранилище блобов, то есть неизменяемого."""
+    return name.startswith(BLOB_DIR + '/')
+
+
+def blob_hash(name):
+    """Хэш блоба по имени его файла или копии (abcdef-640.webp)."""
+    stem = os.path.splitext(os.path.basename(name))[0]
+    return stem.split('-', 1)[0]
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """Файлы хранятся под именем SHA-256 своего содержимого.
+
+    Повторная загрузка той же картинки — в пост или в категорию —
+    ссылается на уже сохранённый файл, а его URL никогда не меняет
+    содержимое и может кэшироваться навсегда. upload_to поля
+    не используется: все блобы лежат в общем каталоге BLOB_DIR.
+    """
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        digest = getattr(content, 'content_hash', None)
+        if digest is None:
+            digest = self.hash_content(content)
+        extension = os.path.splitext(name)[1].lower()
+        name = f'{BLOB_DIR}/{digest[:2]}/{digest}{extension}'
+        if self.exists(name):
+            # gc_media не трогает файлы моложе --grace: новая ссылка
+            # на старый блоб не должна застать его удаление.
+            os.utime(self.path(name))
+            return name
+        return super().save(name, content, max_length)
+
+    @staticmethod
+    def hash_content(content):
+        hasher = hashlib.sha256()
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        for chunk in content.chunks():
+            hasher.update(chunk)
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        return hasher.hexdigest()
+
+
+content_addressed_storage = ContentAddressedStorage()
+
+
+def get_media_storage():
+    """Хранилище полей изображений (функция — для сериализации в миграциях)."""
+    return content_addressed_storage
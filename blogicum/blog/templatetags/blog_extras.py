@@ -0,0 +1,25 @@
+"""Теги и фильтры шаблонов блога."""
+from django import template
+
+from blog.images import available_variants
+from blog.routes import blog_url as build_blog_url
+
+
+register = template.Library()
+
+
+@register.filter
+def srcset(image, image_format):
+    """Значение атрибута srcset из готовых копий изображения."""
+    if not image:
+        return ''
+    return ', '.join(
+        f'{url} {width}w'
+        for width, url in available_variants(image, image_format)
+    )
+
+
+@register.simple_tag
+def blog_url(view_name, *args, **kwargs):
+    """{% url %} для пространства имён blog без обхода резолвера."""
+    return build_blog_url(view_name, *args, **kwargs)
@@ -0,0 +1,101 @@
+"""Предварительная компиляция шаблонов.
+
+С cached.Loader скомпилированный шаблон живёт в памяти процесса;
+preload_templates() заполняет этот кэш при старте, чтобы первые
+запросы рабочего процесса не читали и не разбирали шаблоны с диска.
+"""
+import logging
+import os
+from time import perf_counter
+
+from django.template import Engine, TemplateSyntaxError, engines
+from django.template.loaders.cached import Loader as CachedLoader
+
+
+CACHED_LOADER = 'django.template.loaders.cached.Loader'
+TEMPLATE_SUFFIXES = ('.html', '.txt')
+
+logger = logging.getLogger(__name__)
+
+
+def default_engine():
+    return engines['django'].engine
+
+
+def is_cached(engine):
+    return any(isinstance(loader, CachedLoader)
+               for loader in engine.template_loaders)
+
+
+def uncached_loaders(loaders):
+    """Список загрузчиков без обёртки cached.Loader."""
+    result = []
+    for loader in loaders:
+        if isinstance(loader, (list, tuple)) and loader[0] == CACHED_LOADER:
+            result.extend(loader[1])
+        else:
+            result.append(loader)
+    return result
+
+
+def copy_engine(engine, cached):
+    """Движок с теми же настройками, с кэшем шаблонов или без."""
+    loaders = uncached_loaders(engine.loaders)
+    if cached:
+        loaders = [(CACHED_LOADER, loaders)]
+    return Engine(
+        dirs=engine.dirs,
+        context_processors=engine.context_processors,
+        debug=engine.debug,
+        loaders=loaders,
+        string_if_invalid=engine.string_if_invalid,
+        file_charset=engine.file_charset,
+        libraries=engine.libraries,
+        builtins=engine.builtins[len(Engine.default_builtins):],
+        autoescape=engine.autoescape,
+    )
+
+
+def _source_loaders(engine):
+    for loader in engine.template_loaders:
+        if isinstance(loader, CachedLoader):
+            yield from loader.loaders
+        else:
+            yield loader
+
+
+def template_names(engine):
+    """Имена шаблонов из DIRS и каталогов templates/ приложений."""
+    names = set()
+    for loader in _source_loaders(engine):
+        for directory in loader.get_dirs():
+            for root, _, files in os.walk(directory):
+                relative = os.path.relpath(root, directory)
+                for file_name in files:
+                    if not file_name.endswith(TEMPLATE_SUFFIXES):
+                        continue
+                    path = os.path.normpath(os.path.join(relative, file_name))
+                    names.add(path.replace(os.sep, '/'))
+    return sorted(names)
+
+
+def preload_templates(engine=None, force=False):
+    """Компилирует все шаблоны; возвращает (число, ошибки, секунды).
+
+    Без cached.Loader результат компиляции не сохраняется, поэтому
+    шаблоны разбираются только с force=True — для проверки.
+    """
+    engine = engine or default_engine()
+    if not (force or is_cached(engine)):
+        return 0, {}, 0.0
+    start = perf_counter()
+    compiled, errors = 0, {}
+    for name in template_names(engine):
+        try:
+            engine.get_template(name)
+        except TemplateSyntaxError as error:
+            errors[name] = error
+            logger.warning('Шаблон %s не компилируется: %s', name, error)
+        else:
+            compiled += 1
+    return compiled, errors, perf_counter() - start
@@ -0,0 +1,127 @@
+"""Потоковая загрузка изображений."""
+import hashlib
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.files.uploadedfile import (
+    SimpleUploadedFile,
+    TemporaryUploadedFile,
+)
+from django.core.files.uploadhandler import FileUploadHandler
+from django.template.defaultfilters import filesizeformat
+
+
+# Сигнатуры форматов, которые принимают поля изображений блога.
+IMAGE_SIGNATURES = (
+    b'\xff\xd8\xff',  # JPEG
+    b'\x89PNG\r\n\x1a\n',  # PNG
+    b'GIF87a',
+    b'GIF89a',
+)
+
+
+def looks_like_image(head):
+    """Проверка формата по первым байтам файла."""
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return True
+    return head.startswith(IMAGE_SIGNATURES)
+
+
+def max_upload_size():
+    return getattr(settings, 'BLOG_IMAGE_MAX_UPLOAD_SIZE', 10 * 1024 * 1024)
+
+
+def upload_staging_dir():
+    """Каталог для загрузок рядом с MEDIA_ROOT, но не внутри него.
+
+    Он на той же файловой системе, что и хранилище, поэтому сохранение
+    файла в поле модели — это переименование, а не копирование.
+    Недокачанные файлы при этом не видны по MEDIA_URL.
+    """
+    return getattr(settings, 'BLOG_UPLOAD_STAGING_DIR',
+                   os.path.normpath(settings.MEDIA_ROOT) + '_uploads')
+
+
+class StagedUploadedFile(TemporaryUploadedFile):
+    """Загруженный файл в каталоге подготовки с хэшем содержимого."""
+
+    def __init__(self, name, content_type, size, charset,
+                 content_type_extra=None):
+        staging_dir = upload_staging_dir()
+        os.makedirs(staging_dir, exist_ok=True)
+        _, ext = os.path.splitext(name)
+        file = tempfile.NamedTemporaryFile(
+            suffix='.upload' + ext, dir=staging_dir)
+        super(TemporaryUploadedFile, self).__init__(
+            file, name, content_type, size, charset, content_type_extra)
+        self.content_hash = None
+
+
+class RejectedUpload(SimpleUploadedFile):
+    """Отклонённый файл: содержимое отброшено, причина в rejection."""
+
+    def __init__(self, name, content_type, rejection):
+        super().__init__(name, b'', content_type)
+        self.rejection = rejection
+
+
+class StreamingImageUploadHandler(FileUploadHandler):
+    """Пишет загрузку сразу на диск рядом с MEDIA_ROOT и считает SHA-256.
+
+    Файл не с сигнатурой изображения или больше
+    BLOG_IMAGE_MAX_UPLOAD_SIZE отклоняется по первому же куску: дальнейшие
+    данные не сохраняются ни в памяти, ни на диске.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.rejection = None
+        self.file = None
+        self.hasher = hashlib.sha256()
+        if self.content_length and self.content_length > max_upload_size():
+            self.reject_too_large()
+            return
+        self.file = StagedUploadedFile(
+            self.file_name, self.content_type, 0, self.charset,
+            self.content_type_extra)
+
+    def reject(self, rejection):
+        self.rejection = rejection
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def reject_too_large(self):
+        self.reject(
+            'Размер файла превышает '
+            f'{filesizeformat(max_upload_size())}.')
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.rejection is not None:
+            return None
+        if start == 0 and not looks_like_image(raw_data):
+            self.reject('Загрузите изображение в формате JPEG, PNG, GIF '
+                        'или WebP.')
+            return None
+        if start + len(raw_data) > max_upload_size():
+            self.reject_too_large()
+            return None
+        self.file.write(raw_data)
+        self.hasher.update(raw_data)
+        return None
+
+    def file_complete(self, file_size):
+        if self.rejection is None and self.file is not None and not file_size:
+            self.reject('Отправленный файл пуст.')
+        if self.rejection is not None:
+            return RejectedUpload(
+                self.file_name, self.content_type, self.rejection)
+        self.file.seek(0)
+        self.file.size = file_size
+        self.file.content_hash = self.hasher.hexdigest()
+        return self.file
+
+    def upload_interrupted(self):
+        if getattr(self, 'file', None) is not None:
+            self.file.close()
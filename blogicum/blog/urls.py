@@ -8,6 +8,7 @@ app_name = 'blog'
 
 urlpatterns = [
     path('', views.index, name='index'),
+    path('search/', views.search, name='search'),
     path(
         'posts/<int:post_id>/',
         views.PostDetailView.as_view(),
@@ -29,6 +30,11 @@ urlpatterns = [
         name='edit_post'
     ),
     path('posts/<int:post_id>/delete/', views.delete_post, name='delete_post'),
+    path(
+        'posts/<int:post_id>/comments/',
+        views.post_comments,
+        name='post_comments',
+    ),
     path(
         'posts/<int:post_id>/comment/',
         views.add_comment, name='add_comment'),
@@ -42,4 +48,6 @@ urlpatterns = [
         views.delete_comment,
         name='delete_comment',
     ),
+    path('export/<str:kind>/', views.export, name='export'),
+    path('profiling/', views.profiling_stats, name='profiling_stats'),
 ]
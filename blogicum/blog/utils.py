@@ -1,14 +1,180 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+from collections.abc import Sequence
+from datetime import datetime
+from math import ceil
+
 from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+from django.utils.text import Truncator
+
+from .constants import (
+    EXCERPT_WORDS,
+    NUMBER_OF_RECORDS_ON_THE_PAGE,
+    PAGINATION_CURSOR_DEPTH,
+)
+
+
+LAST_PAGE_CURSOR = 'last'
+
+
+def make_excerpt(text):
+    """Анонс поста: то же, что фильтр truncatewords в карточке."""
+    return Truncator(text).words(EXCERPT_WORDS, truncate=' …')
+
+
+def percentile(values, percent):
+    """Процентиль методом ближайшего ранга."""
+    ordered = sorted(values)
+    return ordered[max(0, ceil(percent / 100 * len(ordered)) - 1)]
+
+
+def encode_cursor(value, pk):
+    """Кодирует пару (дата, id) в непрозрачный токен курсора."""
+    raw = f'{value.isoformat()}|{pk}'.encode()
+    return urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Декодирует токен курсора, для испорченного токена вернёт None."""
+    if not token:
+        return None
+    try:
+        raw = urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode()
+        value, pk = raw.split('|')
+        return datetime.fromisoformat(value), int(pk)
+    except (BinasciiError, UnicodeDecodeError, ValueError):
+        return None
+
+
+class CursorPage(Sequence):
+    """Страница курсорной (keyset) пагинации.
+
+    В отличие от Page из django.core.paginator, не знает ни номера
+    страницы, ни общего числа записей, поэтому не требует COUNT и OFFSET.
+    """
+
+    is_cursor = True
+
+    def __init__(self, object_list, has_next, has_previous,
+                 key_field='pub_date'):
+        self.object_list = object_list
+        self._has_next = has_next
+        self._has_previous = has_previous
+        self.key_field = key_field
 
-from .constants import NUMBER_OF_RECORDS_ON_THE_PAGE
+    def __repr__(self):
+        return f'<CursorPage: {len(self)} objects>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    @property
+    def next_cursor(self):
+        if not self.has_next():
+            return None
+        return cursor_for(self.object_list[-1], self.key_field)
+
+    @property
+    def previous_cursor(self):
+        if not self.has_previous():
+            return None
+        return cursor_for(self.object_list[0], self.key_field)
+
+
+def cursor_for(obj, key_field='pub_date'):
+    """Возвращает токен курсора, указывающий на объект."""
+    return encode_cursor(getattr(obj, key_field), obj.pk)
+
+
+def keyset_page(queryset, after=None, before=None,
+                per_page=NUMBER_OF_RECORDS_ON_THE_PAGE,
+                key_field='pub_date', descending=True):
+    """Возвращает страницу записей после/до курсора.
+
+    Записи упорядочиваются по (key_field, id), а граница страницы
+    задаётся условием по этой паре, так что запрос всегда читает
+    не больше per_page + 1 строк независимо от глубины страницы.
+    """
+    forward = before is None
+    cursor = decode_cursor(after if forward else before)
+    if not forward and cursor is None and before != LAST_PAGE_CURSOR:
+        # Испорченный токен ведёт на первую страницу, как и ?page=abc.
+        forward = True
+    # Направление сравнения: «дальше по ленте» при убывающей сортировке
+    # означает меньшие значения ключа, при возрастающей — большие.
+    older = forward == descending
+    lookup = 'lt' if older else 'gt'
+    sign = '-' if older else ''
+    queryset = queryset.order_by(f'{sign}{key_field}', f'{sign}id')
+    if cursor is not None:
+        value, pk = cursor
+        queryset = queryset.filter(
+            Q(**{f'{key_field}__{lookup}': value})
+            | Q(**{key_field: value, f'id__{lookup}': pk})
+        )
+    objects = list(queryset[:per_page + 1])
+    has_more = len(objects) > per_page
+    objects = objects[:per_page]
+    if forward:
+        return CursorPage(
+            objects, has_more, cursor is not None, key_field)
+    objects.reverse()
+    return CursorPage(objects, cursor is not None, has_more, key_field)
+
+
+class CountedPaginator(Paginator):
+    """Пагинатор, берущий общее число записей у внешнего провайдера."""
+
+    def __init__(self, object_list, per_page, counter=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.counter = counter
+
+    @cached_property
+    def count(self):
+        if self.counter is None:
+            return super().count
+        return self.counter(self.object_list)
 
 
 def paginated_page_object(
         posts,
         request,
-        posts_per_page=NUMBER_OF_RECORDS_ON_THE_PAGE):
-    """Функция возвращает объекты страницы с пагинатаором."""
-    paginator = Paginator(posts, posts_per_page)
+        posts_per_page=NUMBER_OF_RECORDS_ON_THE_PAGE,
+        counter=None,
+        keyset=True):
+    """Функция возвращает объекты страницы с пагинатаором.
+
+    Параметры ?after= и ?before= включают курсорную пагинацию,
+    иначе используется обычная постраничная по ?page=.
+    counter — провайдер числа записей (например, blog.caching.FeedCounter).
+    keyset=False — только постраничная: для выборок не по дате.
+    """
+    after = request.GET.get('after')
+    before = request.GET.get('before')
+    if keyset and (after or before):
+        return keyset_page(posts, after=after, before=before,
+                           per_page=posts_per_page)
+    paginator = CountedPaginator(posts, posts_per_page, counter)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
+    # Последняя страница — курсором: OFFSET до неё растёт с лентой.
+    page_obj.last_cursor = LAST_PAGE_CURSOR if keyset else None
+    # Глубокие страницы дальше листаются курсором, а не OFFSET.
+    if (keyset and page_obj.number >= PAGINATION_CURSOR_DEPTH
+            and page_obj.has_next()):
+        page_obj.next_cursor = cursor_for(page_obj[-1])
     return page_obj
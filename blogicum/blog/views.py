@@ -4,40 +4,68 @@ from django.views.generic import (
     UpdateView,
     DetailView,
 )
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth import get_user_model
-from django.http import Http404
+from django.db import transaction
+from django.http import Http404, JsonResponse, StreamingHttpResponse
 from django.http import HttpResponseForbidden
 from django.urls import reverse_lazy
+from django.utils.decorators import method_decorator
+from django.utils.http import urlencode
 
 from blog.forms import CreateForm, CommentForm, ProfileForm
-from blog.models import Post, Category, Comment
-from .querysets import apply_publication_filters, apply_publication_annotat
-from .utils import paginated_page_object
-from .constants import NUMBER_OF_RECORDS_ON_THE_PAGE
+from blog.models import Post, Comment
+from .caching import (
+    INDEX_FEED,
+    FeedCounter,
+    anonymous_page_cache,
+    category_feed,
+    post_tags,
+    profile_feed,
+    tag_feed_page,
+    tag_request,
+)
+from .export import EXPORTS, FORMATS
+from .images import schedule_post_variants
+from .lookups import authors, categories, with_cached_relations
+from .profiling import profile_stats
+from .search import get_search_backend
+from .querysets import (
+    apply_detail_fields,
+    apply_feed_fields,
+    apply_publication_filters,
+    apply_publication_ordering,
+)
+from .utils import keyset_page, paginated_page_object
+from .constants import COMMENTS_PER_PAGE, NUMBER_OF_RECORDS_ON_THE_PAGE
 
 
 User = get_user_model()
 
 
+@anonymous_page_cache
 def index(request):
     """Главная страница."""
     template_name = 'blog/index.html'
-    post_list = apply_publication_annotat(
+    post_list = apply_feed_fields(apply_publication_ordering(
         apply_publication_filters(Post.objects.all())
-    )
+    ))
     page_obj = paginated_page_object(
         post_list,
         request,
-        NUMBER_OF_RECORDS_ON_THE_PAGE)
+        NUMBER_OF_RECORDS_ON_THE_PAGE,
+        FeedCounter(INDEX_FEED))
+    tag_feed_page(request, page_obj, INDEX_FEED)
     context = {
         'page_obj': page_obj
     }
     return render(request, template_name, context)
 
 
+@method_decorator(anonymous_page_cache, name='dispatch')
 class PostDetailView(DetailView):
     """CBV функция страницы поста"""
 
@@ -46,51 +74,125 @@ class PostDetailView(DetailView):
     context_object_name = 'post'
     pk_url_kwarg = 'post_id'
 
+    def get_queryset(self):
+        return apply_detail_fields(super().get_queryset())
+
     def get_object(self):
         object = super(PostDetailView, self).get_object()
-        if self.request.user != object.author and (
-            not object.is_published or not object.category.is_published
-        ):
-            raise Http404()
+        check_post_visible(self.request.user, object)
         return object
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['form'] = CommentForm()
-        context['comments'] = self.object.comments.select_related('author')
+        context['comments'] = comments_page(self.request, self.object)
         return context
 
 
+def check_post_visible(user, post):
+    """Снятый с публикации пост виден только автору."""
+    if user.pk != post.author_id and (
+        not post.is_published or not post.category.is_published
+    ):
+        raise Http404()
+
+
+def comments_page(request, post):
+    """Порция комментариев поста после курсора ?after=.
+
+    Страница поста выводит только первую порцию, остальные подгружаются
+    по ссылке «Показать ещё», так что время ответа не зависит
+    от числа комментариев.
+    """
+    comments = keyset_page(
+        with_cached_relations(post.comments.only(
+            'text', 'created_at', 'post', 'author')),
+        after=request.GET.get('after'),
+        per_page=COMMENTS_PER_PAGE,
+        key_field='created_at',
+        descending=False)
+    tag_request(request, post_tags(post) | {
+        f'author:{comment.author_id}' for comment in comments
+    })
+    return comments
+
+
+@anonymous_page_cache
+def post_comments(request, post_id):
+    """Фрагмент HTML со следующей порцией комментариев поста."""
+    post = get_object_or_404(
+        Post.objects.select_related('category').only(
+            'is_published', 'author', 'category', 'location',
+            'category__is_published'),
+        pk=post_id)
+    check_post_visible(request.user, post)
+    context = {
+        'post': post,
+        'comments': comments_page(request, post),
+    }
+    return render(request, 'includes/comment_list.html', context)
+
+
+@anonymous_page_cache
+def search(request):
+    """Поиск по заголовкам и текстам опубликованных постов."""
+    template_name = 'blog/search.html'
+    query = request.GET.get('q', '').strip()
+    page_obj = None
+    if query:
+        post_list = get_search_backend().search(
+            apply_feed_fields(apply_publication_filters(Post.objects.all())),
+            query)
+        # Результаты упорядочены по релевантности, а не по дате,
+        # поэтому курсорная пагинация к ним неприменима.
+        page_obj = paginated_page_object(
+            post_list, request, NUMBER_OF_RECORDS_ON_THE_PAGE, keyset=False)
+        tag_feed_page(request, page_obj, INDEX_FEED)
+    context = {
+        'query': query,
+        'page_obj': page_obj,
+        'page_query': urlencode({'q': query}) + '&',
+    }
+    return render(request, template_name, context)
+
+
+@anonymous_page_cache
 def category_posts(request, category_slug):
     """Страница с категорией поста."""
     template_name = 'blog/category.html'
-    category = get_object_or_404(
-        Category,
-        slug=category_slug,
-        is_published=True
-    )
-    post_list = apply_publication_filters(
+    category = categories.get_published(category_slug)
+    if category is None:
+        raise Http404()
+    post_list = apply_feed_fields(apply_publication_ordering(
         apply_publication_filters(
             category.posts.all())
-    )
+    ))
     page_obj = paginated_page_object(
         post_list,
         request,
-        NUMBER_OF_RECORDS_ON_THE_PAGE)
+        NUMBER_OF_RECORDS_ON_THE_PAGE,
+        FeedCounter(category_feed(category.id)))
+    tag_feed_page(request, page_obj, category_feed(category.id))
     context = {'category': category,
                'page_obj': page_obj}
     return render(request, template_name, context)
 
 
+@anonymous_page_cache
 def profile(request, username):
     """Вью функция профиля пользователя"""
-    profile = get_object_or_404(User, username=username)
-    post_list = apply_publication_annotat(
-        profile.posts.all())
+    profile = authors.get_by_username(username)
+    if profile is None:
+        raise Http404()
+    post_list = apply_feed_fields(apply_publication_ordering(
+        profile.posts.all()))
     page_obj = paginated_page_object(
         post_list,
         request,
-        NUMBER_OF_RECORDS_ON_THE_PAGE)
+        NUMBER_OF_RECORDS_ON_THE_PAGE,
+        FeedCounter(profile_feed(profile.id)))
+    tag_feed_page(request, page_obj, profile_feed(profile.id))
+    tag_request(request, {f'author:{profile.id}'})
     context = {
         'profile': profile,
         'page_obj': page_obj,
@@ -108,7 +210,9 @@ class PostCreateView(LoginRequiredMixin, CreateView):
 
     def form_valid(self, form):
         form.instance.author = self.request.user
-        return super().form_valid(form)
+        response = super().form_valid(form)
+        schedule_post_variants(self.object)
+        return response
 
 
 class ProfileEditView(LoginRequiredMixin, UpdateView):
@@ -146,6 +250,12 @@ class PostEditView(LoginRequiredMixin, UpdateView):
         context['is_edit'] = True
         return context
 
+    def form_valid(self, form):
+        response = super().form_valid(form)
+        if 'image' in form.changed_data:
+            schedule_post_variants(self.object)
+        return response
+
 
 @login_required
 def delete_post(request, post_id):
@@ -179,7 +289,8 @@ def add_comment(request, post_id):
         comment = form.save(commit=False)
         comment.author = request.user
         comment.post = post
-        comment.save()
+        with transaction.atomic():
+            comment.save()
     return redirect('blog:post_detail', post_id)
 
 
@@ -215,10 +326,32 @@ def delete_comment(request, post_id, comment_id):
         )
 
     if request.method == 'POST':
-        comment.delete()
+        with transaction.atomic():
+            comment.delete()
         return redirect('blog:post_detail', post_id)
 
     context = {
         'comment': comment,
     }
     return render(request, 'blog/comment.html', context)
+
+
+@staff_member_required
+def export(request, kind):
+    """Выгрузка таблицы блога: ?format=jsonl (по умолчанию) или csv."""
+    format_name = request.GET.get('format', 'jsonl')
+    if kind not in EXPORTS or format_name not in FORMATS:
+        raise Http404()
+    lines, content_type, extension = FORMATS[format_name]
+    response = StreamingHttpResponse(
+        lines(kind), content_type=f'{content_type}; charset=utf-8')
+    response['Content-Disposition'] = (
+        f'attachment; filename="{kind}.{extension}"')
+    return response
+
+
+@staff_member_required
+def profiling_stats(request):
+    """Сводка ProfilingMiddleware по view этого процесса."""
+    return JsonResponse(profile_stats.summary(),
+                        json_dumps_params={'ensure_ascii': False})
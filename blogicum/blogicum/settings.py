@@ -28,6 +28,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'blog.profiling.ProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -36,12 +37,25 @@ ROOT_URLCONF = 'blogicum.urls'
 
 TEMPLATES_DIR = BASE_DIR / 'templates'
 
+# Скомпилированные шаблоны хранятся в памяти процесса (cached.Loader),
+# wsgi.py компилирует их все при старте; при DEBUG шаблоны
+# перечитываются с диска, и правки видны без перезапуска.
+BLOG_CACHED_TEMPLATES = not DEBUG
+
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
-        'APP_DIRS': True,
         'OPTIONS': {
+            'loaders': (
+                [('django.template.loaders.cached.Loader', TEMPLATE_LOADERS)]
+                if BLOG_CACHED_TEMPLATES else TEMPLATE_LOADERS
+            ),
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -63,6 +77,37 @@ DATABASES = {
 }
 
 
+# Кэш страниц и счётчиков лент (blog/caching.py) рассчитан и на
+# django.core.cache.backends.filebased.FileBasedCache.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'blogicum',
+    }
+}
+
+
+# Хранилище сессий:
+# 'db' — django_session, чтение на каждый запрос авторизованного
+#     пользователя и запись под общей блокировкой записи SQLite;
+# 'cache' — только CACHES: сессии теряются при очистке кэша;
+# 'signed_cookies' — данные сессии в подписанной cookie: сервер ничего
+#     не хранит, но выход не отзывает скопированную cookie;
+# 'write_behind' — кэш и отложенная пакетная запись в базу
+#     (blog/sessions.py).
+# 'cache' и 'write_behind' требуют кэша, общего для всех процессов
+# (не LocMemCache), иначе manage.py check сообщит об ошибке blog.E001.
+# Истёкшие строки django_session удаляет cleanup_sessions.
+BLOG_SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cache': 'django.contrib.sessions.backends.cache',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+    'write_behind': 'blog.sessions',
+}
+BLOG_SESSION_MODE = 'db'
+SESSION_ENGINE = BLOG_SESSION_ENGINES[BLOG_SESSION_MODE]
+
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -100,14 +145,39 @@ STATICFILES_DIRS = [
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 
-INTERNAK_IPS = [
+INTERNAL_IPS = [
     '127.0.0.1'
 ]
 
+# Доля запросов, для которых ProfilingMiddleware замеряет SQL и шаблоны;
+# запросы с BLOG_PROFILING_IPS, от персонала и при DEBUG с INTERNAL_IPS
+# замеряются всегда и получают заголовок Server-Timing.
+BLOG_PROFILING_SAMPLE_RATE = 0.01
+BLOG_PROFILING_IPS = []
+
 CSRF_FAILURE_VIEW = 'pages.views.csrf_failure'
 
 MEDIA_ROOT = BASE_DIR / 'media'
 
+MEDIA_URL = '/media/'
+
+# Медиафайлы отдаёт blog.media.serve_media и без DEBUG; байты передаёт
+# фронт-сервер: 'x-sendfile', 'x-accel-redirect' или None — сам Django.
+BLOG_SERVE_MEDIA = True
+BLOG_MEDIA_SENDFILE = None
+BLOG_MEDIA_ACCEL_PREFIX = '/protected-media/'
+
+# Потоки, создающие копии изображений; 0 — создавать прямо в запросе.
+BLOG_THUMBNAIL_WORKERS = 2
+
+# Загрузки пишутся сразу в каталог рядом с MEDIA_ROOT (по MEDIA_URL
+# он не отдаётся) и проверяются по сигнатуре.
+FILE_UPLOAD_HANDLERS = [
+    'blog.uploadhandlers.StreamingImageUploadHandler',
+]
+
+BLOG_IMAGE_MAX_UPLOAD_SIZE = 10 * 1024 * 1024
+
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
@@ -1,8 +1,11 @@
-from django.urls import include, path, reverse_lazy
+import re
+
+from django.urls import include, path, re_path, reverse_lazy
 from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib import admin
 from django.views.generic.edit import CreateView
+from blog.media import serve_media
 from users.forms import CustomUserCreationForm
 
 app_name = 'blogicum'
@@ -23,7 +26,14 @@ urlpatterns = [
     ),
 ] + static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
 
-urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+if settings.DEBUG or getattr(settings, 'BLOG_SERVE_MEDIA', False):
+    urlpatterns += [
+        re_path(
+            r'^%s(?P<path>.*)$' % re.escape(settings.MEDIA_URL.lstrip('/')),
+            serve_media,
+            {'document_root': settings.MEDIA_ROOT},
+        ),
+    ]
 
 handler404 = 'pages.views.page_not_found'
 handler500 = 'pages.views.server_error'
@@ -14,3 +14,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
 
 application = get_wsgi_application()
+
+# Шаблоны компилируются до первого запроса; с --preload у gunicorn
+# рабочие процессы получают их уже готовыми.
+from blog.templating import preload_templates  # noqa: E402
+
+preload_templates()
@@ -0,0 +1,26 @@
+// Подгрузка следующих комментариев без перезагрузки страницы.
+// Без JavaScript ссылка «Показать ещё» открывает страницу поста
+// со следующей порцией комментариев.
+document.addEventListener('click', function (event) {
+  var link = event.target.closest('[data-more-comments] a');
+  if (!link) {
+    return;
+  }
+  event.preventDefault();
+  var block = link.parentElement;
+  link.classList.add('disabled');
+  fetch(link.dataset.fragmentUrl, {credentials: 'same-origin'})
+    .then(function (response) {
+      if (!response.ok) {
+        throw new Error(response.statusText);
+      }
+      return response.text();
+    })
+    .then(function (html) {
+      block.insertAdjacentHTML('beforebegin', html);
+      block.remove();
+    })
+    .catch(function () {
+      window.location.href = link.href;
+    });
+});
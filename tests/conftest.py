@@ -37,10 +37,22 @@ TitledUrlRepr = TypeVar("TitledUrlRepr", bound=Tuple[UrlRepr, str])
 
 @pytest.fixture(autouse=True)
 def enable_debug_false():
-    with override_settings(DEBUG=False):
+    with override_settings(DEBUG=False, BLOG_THUMBNAIL_WORKERS=0):
         yield
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # Откат транзакции теста не вызывает сигналов сброса кэша.
+    from django.core.cache import cache
+
+    from blog.sessions import pending_sessions
+
+    cache.clear()
+    pending_sessions.clear()
+    yield
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -93,6 +105,7 @@ pytest_plugins = [
     "fixtures.categories",
     "fixtures.comments",
     "adapters.comment",
+    "fixtures.query_budgets",
 ]
 
 
@@ -363,6 +376,7 @@ def cleanup(request):
                     filename.endswith(".jpg")
                     or filename.endswith(".gif")
                     or filename.endswith(".png")
+                    or filename.endswith(".webp")
             ):
                 file_path = os.path.join(root, filename)
                 if os.path.getmtime(file_path) >= start_time:
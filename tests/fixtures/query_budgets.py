@@ -0,0 +1,84 @@
+"""Бюджеты SQL-запросов страниц.
+
+Бюджеты хранятся в tests/query_budgets.json: число запросов и их
+нормализованный текст. Запуск с UPDATE_QUERY_BUDGETS=1 перезаписывает
+манифест фактическими значениями.
+"""
+import difflib
+import json
+import os
+import re
+from contextlib import contextmanager
+from pathlib import Path
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+MANIFEST = Path(__file__).resolve().parent.parent / "query_budgets.json"
+UPDATE_ENV = "UPDATE_QUERY_BUDGETS"
+
+_LITERALS = (
+    (re.compile(r'"s\d+_x\d+"'), '"savepoint"'),
+    (re.compile(r"'(?:[^']|'')*'"), "?"),
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),
+    (re.compile(r"\((?:\?, )+\?\)"), "(...)"),
+)
+
+
+def normalize_sql(sql):
+    """Текст запроса без литералов: id и даты меняются от запуска к запуску."""
+    for pattern, replacement in _LITERALS:
+        sql = pattern.sub(replacement, sql)
+    return sql
+
+
+def _updating():
+    return os.environ.get(UPDATE_ENV) == "1"
+
+
+@pytest.fixture(scope="session")
+def query_budgets():
+    budgets = json.loads(MANIFEST.read_text()) if MANIFEST.exists() else {}
+    yield budgets
+    if _updating():
+        MANIFEST.write_text(
+            json.dumps(budgets, indent=2, sort_keys=True, ensure_ascii=False)
+            + "\n"
+        )
+
+
+@pytest.fixture
+def query_budget(query_budgets):
+    """Проверяет, что блок кода укладывается в бюджет запросов `name`.
+
+    with query_budget("blog:index[anonymous]"):
+        client.get("/")
+    """
+
+    @contextmanager
+    def check(name):
+        with CaptureQueriesContext(connection) as context:
+            yield context
+        queries = [normalize_sql(q["sql"]) for q in context.captured_queries]
+        if _updating():
+            query_budgets[name] = {"queries": len(queries), "sql": queries}
+            return
+        budget = query_budgets.get(name)
+        if budget is None:
+            pytest.fail(
+                f"Для `{name}` нет бюджета запросов в {MANIFEST.name}. "
+                f"Запустите тесты с {UPDATE_ENV}=1."
+            )
+        if len(queries) > budget["queries"]:
+            diff = "\n".join(
+                difflib.unified_diff(
+                    budget["sql"], queries, "бюджет", "факт", lineterm=""
+                )
+            )
+            pytest.fail(
+                f"`{name}` выполняет {len(queries)} SQL-запросов вместо "
+                f"{budget['queries']}:\n{diff}"
+            )
+
+    return check
@@ -0,0 +1,48 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db.models import Count, F
+
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def seeded():
+    call_command(
+        "seed_blog",
+        posts=40,
+        comments=3,
+        users=5,
+        categories=3,
+        locations=3,
+        batch_size=7,
+        seed=1,
+        stdout=StringIO(),
+    )
+
+
+def test_seed_blog(seeded):
+    assert Post.objects.count() == 40
+    assert Comment.objects.exists()
+    mismatched = Post.objects.annotate(
+        actual=Count("comments")
+    ).exclude(comment_count=F("actual"))
+    assert not mismatched.exists(), (
+        "Убедитесь, что seed_blog заполняет Post.comment_count."
+    )
+    assert not Post.objects.filter(excerpt="").exists()
+
+
+def test_benchmark_views_reports_json(seeded):
+    out = StringIO()
+    call_command("benchmark_views", requests=3, warmup=0, stdout=out)
+    report = json.loads(out.getvalue())
+    assert {"index", "post_detail", "profile"} <= report["views"].keys()
+    for result in report["views"].values():
+        assert result["errors"] == 0
+        assert result["p50_ms"] <= result["p95_ms"] <= result["p99_ms"]
+        assert result["queries"] >= 0
@@ -0,0 +1,69 @@
+import pytest
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from mixer.backend.django import Mixer
+
+from blog.models import Post
+from blog.querysets import apply_feed_fields
+
+pytestmark = [pytest.mark.django_db]
+
+MARKER = "закэшированная-карточка"
+
+
+@pytest.fixture
+def post(mixer: Mixer, user, published_category):
+    return mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        title="Исходный заголовок",
+    )
+
+
+def plant_marker(post):
+    """Подменяет закэшированную карточку поста меткой."""
+    feed_post = apply_feed_fields(Post.objects.filter(pk=post.pk)).get()
+    key = make_template_fragment_key(
+        "post_card", [post.pk, feed_post.card_version]
+    )
+    assert cache.get(key) is not None, (
+        "Убедитесь, что карточка поста кэшируется как фрагмент шаблона."
+    )
+    cache.set(key, MARKER)
+
+
+@pytest.fixture
+def cached_card(post, user_client):
+    user_client.get("/")
+    plant_marker(post)
+    return post
+
+
+def test_second_render_reuses_card(cached_card, user_client):
+    assert MARKER in user_client.get("/").content.decode(), (
+        "Убедитесь, что повторная отрисовка ленты берёт карточку из кэша."
+    )
+
+
+def test_edited_post_gets_new_card(cached_card, user_client):
+    cached_card.title = "Новый заголовок"
+    cached_card.save()
+    content = user_client.get("/").content.decode()
+    assert MARKER not in content and "Новый заголовок" in content
+
+
+def test_comment_gets_new_card(cached_card, user_client, mixer: Mixer):
+    mixer.blend("blog.Comment", post=cached_card, author=cached_card.author)
+    assert MARKER not in user_client.get("/").content.decode(), (
+        "Убедитесь, что новый комментарий меняет версию карточки."
+    )
+
+
+def test_renamed_author_gets_new_card(cached_card, user_client):
+    author = cached_card.author
+    author.username = "renamed_author"
+    author.save()
+    content = user_client.get("/").content.decode()
+    assert MARKER not in content and "renamed_author" in content
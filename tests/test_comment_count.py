@@ -0,0 +1,108 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import DatabaseError, connection, transaction
+from django.db.models.signals import pre_delete
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import Mixer
+
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def comment_count(post):
+    return Post.objects.values_list("comment_count", flat=True).get(
+        pk=post.pk
+    )
+
+
+@pytest.fixture
+def two_posts(mixer: Mixer, user, published_category):
+    return mixer.cycle(2).blend(
+        "blog.Post", author=user, category=published_category
+    )
+
+
+def test_comment_count_follows_comments(two_posts, mixer: Mixer, user):
+    post, other = two_posts
+    comments = mixer.cycle(3).blend("blog.Comment", post=post, author=user)
+    assert comment_count(post) == 3
+    comments[0].delete()
+    assert comment_count(post) == 2
+    comment = comments[1]
+    comment.text = "Правка"
+    comment.save()
+    assert comment_count(post) == 2, (
+        "Убедитесь, что правка комментария не меняет счётчик."
+    )
+    comment.post = other
+    comment.save()
+    assert (comment_count(post), comment_count(other)) == (1, 1), (
+        "Убедитесь, что перенос комментария в другой пост меняет "
+        "счётчики обоих постов."
+    )
+
+
+def test_post_delete_cascades_without_per_comment_updates(
+        two_posts, mixer: Mixer, user):
+    post, other = two_posts
+    mixer.cycle(30).blend("blog.Comment", post=post, author=user)
+    mixer.blend("blog.Comment", post=other, author=user)
+    with CaptureQueriesContext(connection) as queries:
+        post.delete()
+    updates = [
+        q for q in queries if q["sql"].startswith('UPDATE "blog_post"')
+    ]
+    assert not updates, (
+        "Убедитесь, что при удалении поста счётчик не уменьшается "
+        "для каждого его комментария."
+    )
+    # комментарии, пост, поисковый индекс, комментарии
+    assert len(queries) == 4, (
+        "Убедитесь, что число запросов при удалении поста не зависит "
+        "от числа его комментариев."
+    )
+    assert not Comment.objects.filter(post_id=post.pk).exists()
+    assert comment_count(other) == 1
+
+
+def test_rolled_back_post_delete_leaves_no_marks(two_posts, mixer: Mixer,
+                                                 user):
+    # Вне запроса: как в manage.py shell или import_blog.
+    post, _ = two_posts
+    comments = mixer.cycle(2).blend("blog.Comment", post=post, author=user)
+
+    def fail(**kwargs):
+        raise DatabaseError
+
+    # Удаление обрывается после pre_delete поста.
+    pre_delete.connect(fail, sender=Comment)
+    try:
+        with pytest.raises(DatabaseError), transaction.atomic():
+            post.delete()
+    finally:
+        pre_delete.disconnect(fail, sender=Comment)
+    comments[0].delete()
+    assert comment_count(post) == 1, (
+        "Убедитесь, что откаченное удаление поста не мешает уменьшать "
+        "счётчик при удалении его комментариев."
+    )
+
+
+def test_user_delete_keeps_other_counters(two_posts, mixer: Mixer, user,
+                                          another_user):
+    post, _ = two_posts
+    mixer.blend("blog.Comment", post=post, author=another_user)
+    mixer.blend("blog.Comment", post=post, author=user)
+    another_user.delete()
+    assert comment_count(post) == 1
+
+
+def test_recount_comments(two_posts, mixer: Mixer, user):
+    post, other = two_posts
+    mixer.cycle(2).blend("blog.Comment", post=post, author=user)
+    Post.objects.update(comment_count=7)
+    call_command("recount_comments", stdout=StringIO())
+    assert (comment_count(post), comment_count(other)) == (2, 0)
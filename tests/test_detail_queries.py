@@ -0,0 +1,56 @@
+import pytest
+
+from blog.lookups import authors
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def hidden_post(mixer, user, published_category):
+    return mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=False,
+    )
+
+
+@pytest.mark.parametrize(
+    ("client_name", "queries"),
+    [
+        # сессия, пользователь, пост, комментарии
+        ("user_client", 4),
+        # пост, комментарии
+        ("client", 2),
+    ],
+    ids=["author", "anonymous"],
+)
+def test_post_detail_queries(
+    request,
+    client_name,
+    queries,
+    post_with_published_location,
+    comment_to_a_post,
+    django_assert_num_queries,
+):
+    client = request.getfixturevalue(client_name)
+    url = f"/posts/{post_with_published_location.id}/"
+    # Авторы комментариев берутся из кэша, как в работающем процессе.
+    authors.get_many([comment_to_a_post.author_id])
+    with django_assert_num_queries(queries):
+        response = client.get(url)
+    assert response.status_code == 200
+    assert f"comment_{comment_to_a_post.id}" in response.content.decode(
+        "utf-8"
+    )
+
+
+def test_hidden_post_detail_queries(
+    hidden_post, client, user_client, django_assert_num_queries
+):
+    with django_assert_num_queries(1):
+        assert client.get(f"/posts/{hidden_post.id}/").status_code == 404
+    with django_assert_num_queries(4):
+        assert (
+            user_client.get(f"/posts/{hidden_post.id}/").status_code == 200
+        )
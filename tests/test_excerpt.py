@@ -0,0 +1,72 @@
+from importlib import import_module
+from types import SimpleNamespace
+
+import pytest
+from django.apps import apps
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import Mixer
+
+from blog.models import Post
+from blog.querysets import apply_feed_fields
+from blog.utils import make_excerpt
+
+pytestmark = [pytest.mark.django_db]
+
+LONG_TEXT = " ".join(f"слово{i}" for i in range(30))
+
+
+@pytest.fixture
+def post(mixer: Mixer, user, published_category):
+    return mixer.blend(
+        "blog.Post", author=user, category=published_category, text="Коротко"
+    )
+
+
+def stored_excerpt(post):
+    return Post.objects.values_list("excerpt", flat=True).get(pk=post.pk)
+
+
+def test_save_fills_excerpt(post):
+    assert stored_excerpt(post) == "Коротко"
+    post.text = LONG_TEXT
+    post.save(update_fields=["text"])
+    assert stored_excerpt(post) == make_excerpt(LONG_TEXT), (
+        "Убедитесь, что save(update_fields=['text']) обновляет и анонс."
+    )
+
+
+def test_save_without_text_does_not_load_it(post):
+    post = Post.objects.defer("text").get(pk=post.pk)
+    post.is_published = False
+    with CaptureQueriesContext(connection) as queries:
+        post.save(update_fields=["is_published"])
+    assert not any('"blog_post"."text"' in q["sql"] for q in queries), (
+        "Убедитесь, что save() без text в update_fields не загружает "
+        "отложенный текст поста."
+    )
+    assert stored_excerpt(post) == "Коротко"
+
+
+def test_feed_querysets_do_not_select_text():
+    sql = str(apply_feed_fields(Post.objects.all()).query)
+    assert '"blog_post"."text"' not in sql
+    assert '"blog_post"."excerpt"' in sql
+
+
+def test_feed_never_loads_text_for_empty_excerpt(post, client):
+    Post.objects.filter(pk=post.pk).update(excerpt="")
+    with CaptureQueriesContext(connection) as queries:
+        assert client.get("/").status_code == 200
+    assert not any('"blog_post"."text"' in q["sql"] for q in queries), (
+        "Убедитесь, что карточка поста без анонса не загружает текст."
+    )
+
+
+def test_migration_backfills_excerpts(post):
+    Post.objects.filter(pk=post.pk).update(text=LONG_TEXT, excerpt="")
+    migration = import_module("blog.migrations.0017_backfill_post_excerpt")
+    migration.fill_excerpts(
+        apps, SimpleNamespace(connection=connection)
+    )
+    assert stored_excerpt(post) == make_excerpt(LONG_TEXT)
@@ -0,0 +1,52 @@
+import csv
+import io
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def staff_client(client, user):
+    user.is_staff = True
+    user.save()
+    client.force_login(user)
+    return client
+
+
+def _content(response):
+    return b"".join(response.streaming_content).decode("utf-8")
+
+
+def test_export_view_streams_jsonl(staff_client, comment_to_a_post):
+    response = staff_client.get("/export/comments/")
+    assert response.status_code == 200
+    assert response.streaming, (
+        "Убедитесь, что выгрузка отдаётся потоком StreamingHttpResponse."
+    )
+    rows = [json.loads(line) for line in _content(response).splitlines()]
+    assert [row["id"] for row in rows] == [comment_to_a_post.id]
+    assert rows[0]["post_id"] == comment_to_a_post.post_id
+
+
+def test_export_view_csv(staff_client, post_with_published_location):
+    response = staff_client.get("/export/posts/?format=csv")
+    rows = list(csv.reader(io.StringIO(_content(response))))
+    assert rows[0][:2] == ["id", "title"]
+    assert rows[1][1] == post_with_published_location.title
+    assert 'filename="posts.csv"' in response["Content-Disposition"]
+
+
+def test_export_view_is_staff_only(another_user_client, staff_client):
+    assert another_user_client.get("/export/posts/").status_code == 302
+    assert staff_client.get("/export/users/").status_code == 404
+
+
+def test_export_blog_command(published_locations):
+    out = StringIO()
+    call_command("export_blog", "locations", chunk_size=1, stdout=out)
+    names = [json.loads(line)["name"] for line in out.getvalue().splitlines()]
+    assert names == [location.name for location in published_locations]
@@ -0,0 +1,175 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import Mixer
+
+from blog.caching import (
+    INDEX_FEED,
+    FeedCounter,
+    category_feed,
+    estimate_count,
+    feed_count_key,
+    profile_feed,
+)
+from blog.models import Post
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def feed_posts(mixer: Mixer, user, published_category):
+    return mixer.cycle(N_PER_PAGE + 1).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+    )
+
+
+def counted_feeds(post):
+    return [
+        INDEX_FEED,
+        category_feed(post.category_id),
+        profile_feed(post.author_id),
+    ]
+
+
+def cached_counts(feeds):
+    return cache.get_many([feed_count_key(feed) for feed in feeds])
+
+
+def test_warm_feed_renders_page_bar_without_count(feed_posts, user_client):
+    user_client.get("/")
+    with CaptureQueriesContext(connection) as queries:
+        response = user_client.get("/")
+    assert "?page=2" in response.content.decode(), (
+        "Убедитесь, что на главной выводится переход на вторую страницу."
+    )
+    assert not any("COUNT(*)" in q["sql"] for q in queries), (
+        "Убедитесь, что число постов ленты берётся из кэша."
+    )
+
+
+@pytest.fixture
+def warm_counts(feed_posts, user_client):
+    post = feed_posts[0]
+    for url in (
+        "/",
+        f"/category/{post.category.slug}/",
+        f"/profile/{post.author.username}/",
+    ):
+        user_client.get(url)
+    assert len(cached_counts(counted_feeds(post))) == 3
+    return post
+
+
+def test_new_post_drops_its_feed_counts(warm_counts, mixer: Mixer):
+    mixer.blend(
+        "blog.Post", author=warm_counts.author,
+        category=warm_counts.category, is_published=True,
+    )
+    assert not cached_counts(counted_feeds(warm_counts)), (
+        "Убедитесь, что новый пост сбрасывает число постов главной, "
+        "своей категории и своего автора."
+    )
+
+
+def test_new_post_keeps_other_author_count(
+        warm_counts, mixer: Mixer, another_user):
+    mixer.blend(
+        "blog.Post", author=another_user, category=warm_counts.category,
+        is_published=True,
+    )
+    assert list(cached_counts(counted_feeds(warm_counts))) == [
+        feed_count_key(profile_feed(warm_counts.author_id))
+    ], "Убедитесь, что пост не сбрасывает число постов чужого профиля."
+
+
+def test_deleted_post_drops_its_feed_counts(warm_counts):
+    warm_counts.delete()
+    assert not cached_counts(counted_feeds(warm_counts))
+
+
+def test_unpublished_category_drops_index_and_category_counts(warm_counts):
+    category = warm_counts.category
+    category.is_published = False
+    category.save()
+    remaining = cached_counts(counted_feeds(warm_counts))
+    assert list(remaining) == [
+        feed_count_key(profile_feed(warm_counts.author_id))
+    ], (
+        "Убедитесь, что снятие категории с публикации сбрасывает число "
+        "постов главной и категории, но не профиля."
+    )
+
+
+class FakeCursor:
+    def __init__(self, plan):
+        self.plan = plan
+        self.executed = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def execute(self, sql, params):
+        self.executed.append(sql)
+
+    def fetchone(self):
+        return (self.plan,)
+
+
+@pytest.fixture
+def explain_plan(monkeypatch):
+    """Подменяет СУБД на PostgreSQL с заданным результатом EXPLAIN."""
+
+    def fake(plan):
+        # Только первый курсор — EXPLAIN, остальные запросы идут в базу.
+        cursors = [FakeCursor(plan)]
+        real_cursor = connection.cursor
+        monkeypatch.setattr(connection, "vendor", "postgresql")
+        monkeypatch.setattr(
+            connection, "cursor",
+            lambda: cursors.pop() if cursors else real_cursor(),
+        )
+        return cursors[0]
+
+    return fake
+
+
+@pytest.mark.parametrize(
+    "plan",
+    [
+        [{"Plan": {"Plan Rows": 250000}}],
+        '[{"Plan": {"Plan Rows": 250000}}]',
+    ],
+)
+def test_estimate_reads_explain_json(explain_plan, plan):
+    cursor = explain_plan(plan)
+    assert estimate_count(Post.objects.filter(is_published=True)) == 250000
+    assert cursor.executed[0].startswith("EXPLAIN (FORMAT JSON) SELECT")
+
+
+@pytest.mark.parametrize(
+    "plan",
+    [
+        # Так план возвращает QuerySet.explain(format='json') в Django 3.2.
+        "[{'Plan': {'Plan Rows': 250000}}]",
+        [],
+        [{"Plan": {}}],
+        None,
+    ],
+)
+def test_unparsed_plan_falls_back_to_count(explain_plan, plan, feed_posts):
+    explain_plan(plan)
+    assert estimate_count(Post.objects.all()) is None
+    explain_plan(plan)
+    count = FeedCounter(INDEX_FEED)(Post.objects.all())
+    assert count == len(feed_posts), (
+        "Убедитесь, что при неразобранном плане число постов считается "
+        "через COUNT(*)."
+    )
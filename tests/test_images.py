@@ -0,0 +1,87 @@
+from io import BytesIO
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import override_settings
+from PIL import Image
+
+from blog.images import (
+    available_variants,
+    generate_variants,
+    schedule_post_variants,
+)
+from blog.models import Post
+from blog.storage import content_addressed_storage
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def media_root(tmp_path):
+    with override_settings(MEDIA_ROOT=str(tmp_path)):
+        yield tmp_path
+
+
+@pytest.fixture
+def image_name(media_root):
+    data = BytesIO()
+    Image.new("RGB", (700, 350), "red").save(data, "PNG")
+    return content_addressed_storage.save(
+        "pic.png", ContentFile(data.getvalue())
+    )
+
+
+@pytest.fixture
+def post_with_image(mixer, user, published_category, image_name):
+    return mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        image=image_name,
+    )
+
+
+def test_generate_variants(image_name):
+    created = generate_variants(image_name, default_storage)
+    stem = image_name.rsplit(".", 1)[0]
+    assert sorted(created) == sorted(
+        f"{stem}-{width}.{extension}"
+        for width in (320, 640)
+        for extension in ("webp", "jpg")
+    ), "Убедитесь, что копии шире оригинала не создаются."
+    with default_storage.open(f"{stem}-320.webp") as variant:
+        assert Image.open(variant).size == (320, 160)
+
+
+def test_schedule_post_variants_refreshes_card(
+        post_with_image, django_capture_on_commit_callbacks):
+    modified_at = post_with_image.modified_at
+    with django_capture_on_commit_callbacks(execute=True):
+        schedule_post_variants(post_with_image)
+    assert [width for width, _ in available_variants(
+        post_with_image.image, "webp")] == [320, 640]
+    assert Post.objects.get(pk=post_with_image.pk).modified_at > modified_at
+
+
+def test_variants_are_listed_without_stat_calls(
+        post_with_image, monkeypatch):
+    generate_variants(post_with_image.image.name, default_storage)
+
+    def no_stat(name):
+        raise AssertionError(f"exists({name})")
+
+    monkeypatch.setattr(default_storage, "exists", no_stat)
+    assert len(available_variants(post_with_image.image, "jpeg")) == 2, (
+        "Убедитесь, что список копий берётся из записи, сделанной при их "
+        "создании, а не из проверки файлов на каждую отрисовку."
+    )
+
+
+def test_detail_page_has_srcset(post_with_image, client):
+    generate_variants(post_with_image.image.name, default_storage)
+    content = client.get(f"/posts/{post_with_image.id}/").content.decode()
+    stem = post_with_image.image.name.rsplit(".", 1)[0]
+    assert f"{stem}-320.webp 320w, " in content
+    assert f"{stem}-640.jpg 640w" in content
@@ -0,0 +1,58 @@
+import io
+import json
+from io import StringIO
+from pathlib import Path
+
+import pytest
+from django.core.management import call_command
+
+from blog.management.commands.import_blog import iter_json_array
+from blog.models import Category, Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+DUMP = Path(__file__).resolve().parent.parent / "blogicum" / "db.json"
+
+
+def test_iter_json_array_streams_items():
+    items = [{"a": i, "text": "] , [ \" {}" * i} for i in range(50)]
+    stream = io.StringIO(json.dumps(items, indent=2))
+    assert list(iter_json_array(stream, chunk_size=7)) == items
+
+
+def test_import_blog_loads_dump():
+    out = StringIO()
+    call_command("import_blog", str(DUMP), batch_size=5, stdout=out)
+    dump = json.loads(DUMP.read_text())
+    posts = [item for item in dump if item["model"] == "blog.post"]
+    assert Post.objects.count() == len(posts)
+    assert Category.objects.count() == sum(
+        item["model"] == "blog.category" for item in dump
+    )
+    post = Post.objects.get(pk=posts[0]["pk"])
+    assert post.created_at.isoformat().startswith(
+        posts[0]["fields"]["created_at"][:19]
+    ), "Убедитесь, что даты из дампа не заменяются текущими."
+    assert post.excerpt, "Убедитесь, что после загрузки заполнены анонсы."
+    assert "в секунду" in out.getvalue()
+
+
+def test_import_blog_recounts_comments(tmp_path, mixer, user):
+    post = mixer.blend("blog.Post", author=user)
+    dump = tmp_path / "comments.json"
+    dump.write_text(json.dumps([
+        {
+            "model": "blog.comment",
+            "pk": 100 + i,
+            "fields": {
+                "text": "Комментарий",
+                "post": post.pk,
+                "author": user.pk,
+                "created_at": "2023-01-01T00:00:00Z",
+            },
+        }
+        for i in range(3)
+    ]))
+    call_command("import_blog", str(dump), stdout=StringIO())
+    post.refresh_from_db()
+    assert Comment.objects.count() == post.comment_count == 3
@@ -0,0 +1,61 @@
+import pytest
+from django.db import connection
+
+from blog.models import Comment, Post
+from blog.querysets import (
+    apply_publication_filters,
+    apply_publication_ordering,
+)
+from conftest import N_PER_PAGE
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(
+        connection.vendor != "sqlite",
+        reason="Формат EXPLAIN проверяется только для SQLite",
+    ),
+]
+
+
+def _feed(queryset):
+    return apply_publication_ordering(
+        apply_publication_filters(queryset)
+    )[:N_PER_PAGE + 1]
+
+
+@pytest.mark.parametrize(
+    ("queryset_factory", "table", "index_name"),
+    [
+        (lambda: _feed(Post.objects.all()), "blog_post", "post_feed_idx"),
+        (
+            lambda: _feed(Post.objects.filter(category_id=1)),
+            "blog_post",
+            "post_category_feed_idx",
+        ),
+        (
+            lambda: apply_publication_ordering(
+                Post.objects.filter(author_id=1)
+            )[:N_PER_PAGE + 1],
+            "blog_post",
+            "post_author_feed_idx",
+        ),
+        (
+            lambda: Comment.objects.filter(post_id=1).select_related(
+                "author"
+            ),
+            "blog_comment",
+            "comment_post_created_idx",
+        ),
+    ],
+    ids=["index", "category", "profile", "comments"],
+)
+def test_feed_queries_use_indexes(queryset_factory, table, index_name):
+    plan = queryset_factory().explain()
+    assert f"USING INDEX {index_name}" in plan, (
+        f"Убедитесь, что запрос использует индекс `{index_name}`."
+        f" План запроса:\n{plan}"
+    )
+    assert f"SCAN {table}" not in plan, (
+        f"Убедитесь, что запрос не читает таблицу `{table}` целиком."
+        f" План запроса:\n{plan}"
+    )
@@ -0,0 +1,136 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog import lookups
+from blog.constants import AUTHOR_CACHE_TIMEOUT, LOOKUP_LOCAL_TIMEOUT
+from blog.lookups import LookupCache, authors, categories
+from blog.models import Category
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_snapshot_is_reused_until_invalidated(published_category):
+    categories.snapshot()
+    with CaptureQueriesContext(connection) as queries:
+        assert categories.get(published_category.id) is not None
+        assert categories.get_published(published_category.slug)
+    assert not queries, (
+        "Убедитесь, что категории читаются из памяти, пока версия в кэше "
+        "не изменилась."
+    )
+
+
+def test_other_processes_see_changes(published_category):
+    # Отдельный экземпляр — как кэш другого рабочего процесса.
+    other = LookupCache("blog.Category", slug_field="slug")
+    assert other.get_published(published_category.slug) is not None
+    published_category.is_published = False
+    published_category.save()
+    assert other.get_published(published_category.slug) is None
+
+
+def test_process_local_cache_bounds_staleness(
+        published_category, monkeypatch):
+    # Версия в LocMemCache другого процесса не меняется: правка видна
+    # только по истечении срока снимка.
+    other = LookupCache("blog.Category", slug_field="slug")
+    assert other.get_published(published_category.slug) is not None
+    Category.objects.filter(pk=published_category.pk).update(
+        is_published=False)
+    assert other.get_published(published_category.slug) is not None
+    now = lookups.monotonic()
+    monkeypatch.setattr(
+        lookups, "monotonic", lambda: now + LOOKUP_LOCAL_TIMEOUT)
+    assert other.get_published(published_category.slug) is None, (
+        "Убедитесь, что при кэше процесса справочник перечитывается "
+        "по истечении LOOKUP_LOCAL_TIMEOUT."
+    )
+
+
+@pytest.mark.parametrize(
+    "local, timeout",
+    [(True, LOOKUP_LOCAL_TIMEOUT), (False, AUTHOR_CACHE_TIMEOUT)],
+)
+def test_author_timeout_follows_cache_scope(
+        user, monkeypatch, local, timeout):
+    timeouts = []
+    monkeypatch.setattr(lookups, "process_local_cache", lambda alias: local)
+    monkeypatch.setattr(
+        cache, "set_many",
+        lambda data, timeout: timeouts.append(timeout),
+    )
+    authors.get_many([user.id])
+    assert timeouts == [timeout], (
+        "Убедитесь, что при кэше процесса сведения об авторах живут "
+        "не дольше LOOKUP_LOCAL_TIMEOUT."
+    )
+
+
+def test_category_page_uses_cache(client, post_with_published_location):
+    category = post_with_published_location.category
+    url = f"/category/{category.slug}/"
+    assert client.get(url).status_code == 200
+    category.is_published = False
+    category.save()
+    assert client.get(url).status_code == 404
+    assert client.get("/category/missing/").status_code == 404
+
+
+def test_feed_takes_relations_from_memory(
+    client, post_with_published_location
+):
+    post = post_with_published_location
+    categories.snapshot()
+    with CaptureQueriesContext(connection) as queries:
+        content = client.get("/").content.decode("utf-8")
+    feed_sql = [
+        query["sql"] for query in queries if "LIMIT" in query["sql"]
+        and "blog_post" in query["sql"]
+    ]
+    assert feed_sql and all(
+        '"blog_location"' not in sql and '"auth_user"' not in sql
+        for sql in feed_sql
+    ), "Убедитесь, что запрос ленты не присоединяет места и авторов."
+    assert post.category.title in content
+    assert post.location.name in content
+    post.location.name = "Новое название места"
+    post.location.save()
+    assert "Новое название места" in client.get("/").content.decode("utf-8")
+
+
+def test_authors_are_cached(user, another_user):
+    authors.get_many([user.id])
+    with CaptureQueriesContext(connection) as queries:
+        found = authors.get_many([user.id, another_user.id])
+    assert len(queries) == 1, (
+        "Убедитесь, что за недостающими авторами идёт один запрос."
+    )
+    assert found[user.id] == user
+    assert found[another_user.id].username == another_user.username
+    with CaptureQueriesContext(connection) as queries:
+        authors.get_many([user.id, another_user.id])
+    assert not queries
+
+
+def test_profile_follows_author_changes(client, user):
+    old_username = user.username
+    assert client.get(f"/profile/{old_username}/").status_code == 200
+    user.username = "renamed_author"
+    user.first_name = "Новое Имя"
+    user.save()
+    assert client.get(f"/profile/{old_username}/").status_code == 404
+    response = client.get("/profile/renamed_author/")
+    assert "Новое Имя" in response.content.decode("utf-8")
+
+
+def test_comments_skip_user_join(user_client, comment_to_a_post):
+    post = comment_to_a_post.post
+    with CaptureQueriesContext(connection) as queries:
+        content = user_client.get(f"/posts/{post.id}/").content.decode(
+            "utf-8"
+        )
+    comment_sql = [q["sql"] for q in queries if "blog_comment" in q["sql"]]
+    assert comment_sql and '"auth_user"' not in comment_sql[0]
+    assert f"@{comment_to_a_post.author.username}" in content
@@ -0,0 +1,120 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import Http404
+from django.test import RequestFactory, override_settings
+
+from blog.media import serve_media
+from blog.uploadhandlers import upload_staging_dir
+
+CONTENT = bytes(range(256)) * 4
+
+
+@pytest.fixture
+def media_root(tmp_path):
+    (tmp_path / "cas" / "ab").mkdir(parents=True)
+    (tmp_path / "cas" / "ab" / "abcdef.jpg").write_bytes(CONTENT)
+    (tmp_path / "old.jpg").write_bytes(CONTENT)
+    return tmp_path
+
+
+def _get(media_root, path="cas/ab/abcdef.jpg", **headers):
+    request = RequestFactory().get(f"/media/{path}", **headers)
+    return serve_media(request, path, document_root=media_root)
+
+
+def _body(response):
+    return b"".join(response.streaming_content)
+
+
+def test_media_headers(media_root):
+    response = _get(media_root)
+    assert response.status_code == HTTPStatus.OK
+    assert _body(response) == CONTENT
+    assert response["Accept-Ranges"] == "bytes"
+    assert response["ETag"] and response["Last-Modified"]
+    assert "immutable" in response["Cache-Control"], (
+        "Убедитесь, что файлы хранилища блобов кэшируются навсегда."
+    )
+    assert "immutable" not in _get(media_root, "old.jpg")["Cache-Control"]
+
+
+def test_media_conditional_requests(media_root):
+    first = _get(media_root)
+    by_etag = _get(media_root, HTTP_IF_NONE_MATCH=first["ETag"])
+    by_date = _get(
+        media_root, HTTP_IF_MODIFIED_SINCE=first["Last-Modified"]
+    )
+    assert by_etag.status_code == HTTPStatus.NOT_MODIFIED
+    assert by_date.status_code == HTTPStatus.NOT_MODIFIED
+    assert by_etag["Cache-Control"] == first["Cache-Control"]
+
+
+@pytest.mark.parametrize(
+    ("header", "expected"),
+    [
+        ("bytes=0-9", CONTENT[:10]),
+        ("bytes=1000-", CONTENT[1000:]),
+        ("bytes=-5", CONTENT[-5:]),
+        ("bytes=1020-5000", CONTENT[1020:]),
+    ],
+)
+def test_media_range(media_root, header, expected):
+    response = _get(media_root, HTTP_RANGE=header)
+    assert response.status_code == HTTPStatus.PARTIAL_CONTENT
+    assert _body(response) == expected
+    assert int(response["Content-Length"]) == len(expected)
+    assert response["Content-Range"].endswith(f"/{len(CONTENT)}")
+
+
+def test_media_range_edge_cases(media_root):
+    unsatisfiable = _get(media_root, HTTP_RANGE="bytes=5000-")
+    assert unsatisfiable.status_code == (
+        HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE
+    )
+    assert unsatisfiable["Content-Range"] == f"bytes */{len(CONTENT)}"
+    multiple = _get(media_root, HTTP_RANGE="bytes=0-1,5-6")
+    assert multiple.status_code == HTTPStatus.OK
+    stale = _get(media_root, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"old"')
+    assert stale.status_code == HTTPStatus.OK
+    assert _body(stale) == CONTENT
+
+
+@pytest.mark.parametrize(
+    ("mode", "header", "value"),
+    [
+        ("x-sendfile", "X-Sendfile", "cas/ab/abcdef.jpg"),
+        ("x-accel-redirect", "X-Accel-Redirect", "/internal/cas/ab/"),
+    ],
+)
+def test_media_sendfile(media_root, mode, header, value):
+    with override_settings(
+        BLOG_MEDIA_SENDFILE=mode, BLOG_MEDIA_ACCEL_PREFIX="/internal/"
+    ):
+        response = _get(media_root)
+    assert value in response[header], (
+        "Убедитесь, что передачу файла можно поручить фронт-серверу."
+    )
+    assert not response.content
+    assert "immutable" in response["Cache-Control"]
+
+
+def test_media_path_traversal(media_root):
+    with pytest.raises(SuspiciousFileOperation):
+        _get(media_root, "../etc/passwd")
+    with pytest.raises(Http404):
+        _get(media_root, "cas")
+
+
+def test_media_hides_upload_staging(media_root, settings):
+    settings.MEDIA_ROOT = str(media_root)
+    assert not upload_staging_dir().startswith(str(media_root) + "/"), (
+        "Убедитесь, что загрузки по умолчанию готовятся вне MEDIA_ROOT."
+    )
+    (media_root / "uploads").mkdir()
+    (media_root / "uploads" / "tmp1.upload.jpg").write_bytes(CONTENT)
+    settings.BLOG_UPLOAD_STAGING_DIR = str(media_root / "uploads")
+    with pytest.raises(Http404):
+        _get(media_root, "uploads/tmp1.upload.jpg")
+    assert _get(media_root).status_code == HTTPStatus.OK
@@ -0,0 +1,143 @@
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.db import transaction
+from django.test import override_settings
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog import views
+from blog.caching import (
+    INDEX_FEED,
+    _tag_key,
+    bump_tags,
+    category_feed,
+    feed_timeout,
+)
+
+pytestmark = [pytest.mark.django_db]
+
+LOCMEM_CACHE = {
+    "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    "LOCATION": "page-cache-tests",
+}
+
+
+@pytest.fixture(params=["locmem", "filebased"])
+def cache_backend(request, tmp_path):
+    if request.param == "locmem":
+        config = LOCMEM_CACHE
+    else:
+        config = {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": str(tmp_path),
+        }
+    with override_settings(CACHES={"default": config}):
+        yield
+
+
+@pytest.fixture
+def two_posts(mixer: Mixer, user, published_category, published_location):
+    return mixer.cycle(2).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        location=published_location,
+        is_published=True,
+    )
+
+
+def test_anonymous_pages_are_served_from_cache(
+        cache_backend, two_posts, unlogged_client,
+        django_assert_num_queries):
+    post = two_posts[0]
+    for url in ("/", f"/posts/{post.id}/"):
+        first = unlogged_client.get(url)
+        assert first.status_code == 200
+        with django_assert_num_queries(0):
+            second = unlogged_client.get(url)
+        assert second.content == first.content, (
+            "Убедитесь, что повторный запрос анонима получает ту же страницу"
+            " из кэша."
+        )
+
+
+def test_comment_evicts_only_its_post(
+        cache_backend, two_posts, unlogged_client, mixer: Mixer, user,
+        django_assert_num_queries):
+    commented, other = two_posts
+    unlogged_client.get(f"/posts/{commented.id}/")
+    unlogged_client.get(f"/posts/{other.id}/")
+
+    mixer.blend(
+        "blog.Comment", post=commented, author=user, text="Свежий отзыв"
+    )
+
+    response = unlogged_client.get(f"/posts/{commented.id}/")
+    assert "Свежий отзыв" in response.content.decode("utf-8"), (
+        "Убедитесь, что новый комментарий сбрасывает кэш страницы поста."
+    )
+    with django_assert_num_queries(0):
+        unlogged_client.get(f"/posts/{other.id}/")
+
+
+def test_logged_in_users_bypass_cache(two_posts, user_client,
+                                      unlogged_client):
+    post = two_posts[0]
+    unlogged_client.get(f"/posts/{post.id}/")
+    content = user_client.get(f"/posts/{post.id}/").content.decode("utf-8")
+    assert "Оставить комментарий" in content, (
+        "Убедитесь, что авторизованным пользователям не отдаётся страница"
+        " из кэша анонимов."
+    )
+
+
+def test_feed_cache_expires_at_next_publication(
+        mixer: Mixer, user, published_category):
+    assert feed_timeout(INDEX_FEED, 300) == 300
+    mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=timezone.now() + timedelta(seconds=60),
+    )
+    for feed in (INDEX_FEED, category_feed(published_category.id)):
+        assert 0 < feed_timeout(feed, 300) <= 60, (
+            "Убедитесь, что кэш ленты истекает не позже публикации"
+            " ближайшего отложенного поста."
+        )
+
+
+def test_page_rendered_during_a_write_is_not_cached(
+        two_posts, unlogged_client, mixer: Mixer, user, monkeypatch):
+    post = two_posts[0]
+    comments_page = views.comments_page
+
+    def comment_lands_after_query(request, post):
+        comments = list(comments_page(request, post))
+        mixer.blend("blog.Comment", post=post, author=user, text="поздний")
+        return comments
+
+    monkeypatch.setattr(views, "comments_page", comment_lands_after_query)
+    unlogged_client.get(f"/posts/{post.id}/")
+    monkeypatch.undo()
+    response = unlogged_client.get(f"/posts/{post.id}/")
+    assert "поздний" in response.content.decode(), (
+        "Убедитесь, что страница, данные которой изменились во время "
+        "рендера, не попадает в кэш."
+    )
+
+
+def test_tags_are_bumped_again_on_commit(
+        django_capture_on_commit_callbacks):
+    key = _tag_key("post:1")
+    with django_capture_on_commit_callbacks(execute=True):
+        with transaction.atomic():
+            bump_tags({"post:1"})
+            before_commit = cache.get(key)
+    assert before_commit is not None
+    assert cache.get(key) != before_commit, (
+        "Убедитесь, что bump_tags меняет версии ещё раз после фиксации."
+    )
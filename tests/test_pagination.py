@@ -0,0 +1,113 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog.constants import COMMENTS_PER_PAGE
+from blog.utils import cursor_for
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def feed_posts(mixer: Mixer, user, published_category):
+    # Пары постов с одинаковой датой проверяют порядок по id внутри даты.
+    now = timezone.now()
+    pub_dates = (
+        now - timedelta(hours=i // 2) for i in range(1, N_PER_PAGE * 3 + 1)
+    )
+    return mixer.cycle(N_PER_PAGE * 3).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=pub_dates,
+    )
+
+
+def _ids(response):
+    return [post.id for post in response.context["page_obj"]]
+
+
+def test_cursor_pages_follow_offset_pages(feed_posts, user_client):
+    offset_ids = []
+    for page in range(1, 4):
+        offset_ids += _ids(user_client.get(f"/?page={page}"))
+
+    first = user_client.get("/")
+    cursor_ids = _ids(first)
+    token = cursor_for(first.context["page_obj"][-1])
+    while token:
+        response = user_client.get(f"/?after={token}")
+        page_obj = response.context["page_obj"]
+        cursor_ids += _ids(response)
+        token = page_obj.next_cursor
+    assert cursor_ids == offset_ids, (
+        "Убедитесь, что курсорная пагинация выдаёт публикации в том же"
+        " порядке, что и постраничная, без пропусков и повторов."
+    )
+
+
+def test_cursor_before_returns_previous_page(feed_posts, user_client):
+    second = user_client.get("/?page=2").context["page_obj"]
+    response = user_client.get(f"/?before={cursor_for(second[0])}")
+    assert _ids(response) == _ids(user_client.get("/?page=1"))
+    assert not response.context["page_obj"].has_previous()
+
+    last = user_client.get("/?before=last")
+    assert _ids(last) == _ids(user_client.get("/?page=3"))
+    assert not last.context["page_obj"].has_next()
+
+
+def test_last_page_link_uses_cursor(feed_posts, user_client):
+    content = user_client.get("/").content.decode()
+    assert 'href="?before=last"' in content, (
+        "Убедитесь, что ссылка «Последняя» ведёт на курсор, а не на "
+        "страницу с большим OFFSET."
+    )
+
+
+def test_broken_cursor_falls_back_to_first_page(feed_posts, user_client):
+    response = user_client.get("/?after=not-a-cursor")
+    assert response.status_code == 200
+    assert _ids(response) == _ids(user_client.get("/"))
+
+
+def test_comments_are_loaded_in_batches(
+    mixer: Mixer, post_with_published_location, client
+):
+    post = post_with_published_location
+    comments = mixer.cycle(COMMENTS_PER_PAGE + 5).blend(
+        "blog.Comment", post=post
+    )
+    response = client.get(f"/posts/{post.id}/")
+    first = response.context["comments"]
+    assert [c.id for c in first] == [c.id for c in comments][
+        :COMMENTS_PER_PAGE
+    ], "Убедитесь, что на странице поста выводится первая порция."
+    assert first.has_next()
+
+    fragment = client.get(
+        f"/posts/{post.id}/comments/?after={first.next_cursor}"
+    )
+    assert fragment.status_code == 200
+    assert "<html" not in fragment.content.decode("utf-8")
+    rest = fragment.context["comments"]
+    assert [c.id for c in rest] == [c.id for c in comments][
+        COMMENTS_PER_PAGE:
+    ], "Убедитесь, что фрагмент отдаёт следующую порцию комментариев."
+    assert not rest.has_next()
+
+
+def test_comments_fragment_of_hidden_post(
+    mixer: Mixer, user, published_category, client
+):
+    post = mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=False,
+    )
+    assert client.get(f"/posts/{post.id}/comments/").status_code == 404
@@ -0,0 +1,115 @@
+from pathlib import Path
+
+import pytest
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from blog.profiling import profile_stats
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def clear_stats():
+    profile_stats.clear()
+    yield
+    profile_stats.clear()
+
+
+@pytest.fixture
+def staff_client(user):
+    user.is_staff = True
+    user.save()
+    client = Client()
+    client.force_login(user)
+    return client
+
+
+def _metrics(response):
+    return {
+        metric.split(";")[0].strip(): metric
+        for metric in response["Server-Timing"].split(",")
+    }
+
+
+@override_settings(BLOG_PROFILING_IPS=["127.0.0.1"])
+def test_server_timing_for_profiling_ips(
+    client, many_posts_with_published_locations
+):
+    response = client.get("/")
+    metrics = _metrics(response)
+    assert {"db", "tpl", "view"} <= set(metrics), (
+        "Убедитесь, что для BLOG_PROFILING_IPS ответ содержит "
+        "Server-Timing с временем SQL, шаблонов и view."
+    )
+    assert 'desc="SQL x' in metrics["db"]
+    assert any(
+        "includes/post_card.html x10" in metric for metric in metrics.values()
+    ), "Убедитесь, что время шаблона карточки поста замеряется отдельно."
+
+
+@override_settings(BLOG_PROFILING_SAMPLE_RATE=0, INTERNAL_IPS=["127.0.0.1"])
+def test_internal_ips_are_profiled_only_with_debug(client):
+    # Так выглядит любой запрос за локальным nginx.
+    response = client.get("/", REMOTE_ADDR="127.0.0.1")
+    assert not response.has_header("Server-Timing"), (
+        "Убедитесь, что без DEBUG запросы с INTERNAL_IPS не профилируются."
+    )
+    with override_settings(DEBUG=True):
+        response = client.get("/", REMOTE_ADDR="127.0.0.1")
+    assert response.has_header("Server-Timing")
+
+
+@override_settings(BLOG_PROFILING_SAMPLE_RATE=0)
+def test_no_profiling_for_visitors(client, staff_client):
+    response = client.get("/", REMOTE_ADDR="203.0.113.5")
+    assert not response.has_header("Server-Timing")
+    assert profile_stats.summary() == {}
+    response = staff_client.get("/", REMOTE_ADDR="203.0.113.5")
+    assert response.has_header("Server-Timing"), (
+        "Убедитесь, что персоналу Server-Timing отдаётся с любого адреса."
+    )
+
+
+@override_settings(BLOG_PROFILING_SAMPLE_RATE=1)
+def test_sampled_requests_feed_stats(
+    client, staff_client, post_with_published_location
+):
+    post = post_with_published_location
+    for _ in range(3):
+        response = client.get(f"/posts/{post.id}/", REMOTE_ADDR="203.0.113.5")
+        assert not response.has_header("Server-Timing"), (
+            "Убедитесь, что замеры посетителей не попадают в их ответы."
+        )
+    summary = staff_client.get("/profiling/").json()
+    detail = summary["blog:post_detail"]
+    assert detail["requests"] == 3
+    assert detail["queries"] > 0
+    assert "blog/detail.html" in detail["templates_ms"]
+
+
+def test_stats_are_staff_only(user_client):
+    assert user_client.get("/profiling/").status_code == 302
+
+
+@pytest.fixture
+def media_blob(settings):
+    path = Path(settings.MEDIA_ROOT) / "cas" / "zz" / "profiling.jpg"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"blob")
+    yield "/media/cas/zz/profiling.jpg"
+    path.unlink()
+    path.parent.rmdir()
+
+
+@override_settings(BLOG_PROFILING_SAMPLE_RATE=0)
+def test_media_skips_session_and_user(user_client, media_blob):
+    with CaptureQueriesContext(connection) as queries:
+        response = user_client.get(media_blob)
+    assert response.status_code == 200
+    assert len(queries) == 0, (
+        "Убедитесь, что ProfilingMiddleware не загружает сессию "
+        "и пользователя для медиафайлов."
+    )
+    assert not response.has_header("Vary")
@@ -0,0 +1,106 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import get_resolver, reverse
+from mixer.backend.django import Mixer
+
+from blog.lookups import authors, categories, locations
+from conftest import N_PER_FIXTURE
+
+pytestmark = [pytest.mark.django_db]
+
+PUBLIC = ("unlogged_client", "user_client")
+AUTHOR = ("user_client",)
+
+# (имя URL, аргументы, метод, клиенты). У каждого URL блога
+# и статических страниц должен быть хотя бы один случай.
+# QUERY — параметры строки запроса для GET.
+CASES = (
+    ("blog:index", {}, "get", PUBLIC),
+    ("blog:search", {}, "get", PUBLIC),
+    ("blog:post_detail", {"post_id"}, "get", PUBLIC),
+    ("blog:post_comments", {"post_id"}, "get", PUBLIC),
+    ("blog:category_posts", {"category_slug"}, "get", PUBLIC),
+    ("blog:profile", {"username"}, "get", PUBLIC),
+    ("blog:edit_profile", {}, "get", AUTHOR),
+    ("blog:create_post", {}, "get", AUTHOR),
+    ("blog:edit_post", {"post_id"}, "get", AUTHOR),
+    ("blog:delete_post", {"post_id"}, "get", AUTHOR),
+    ("blog:add_comment", {"post_id"}, "post", AUTHOR),
+    ("blog:edit_comment", {"post_id", "comment_id"}, "get", AUTHOR),
+    ("blog:delete_comment", {"post_id", "comment_id"}, "get", AUTHOR),
+    ("blog:export", {"kind"}, "get", AUTHOR),
+    ("blog:profiling_stats", {}, "get", AUTHOR),
+    ("pages:about", {}, "get", PUBLIC),
+    ("pages:rules", {}, "get", PUBLIC),
+)
+QUERY = {"blog:search": {"q"}}
+
+
+@pytest.fixture
+def blog_data(mixer: Mixer, user, post_with_published_location):
+    post = post_with_published_location
+    # Посты и комментарии разных авторов: N+1 в шаблонах
+    # карточки и комментариев увеличит число запросов.
+    mixer.cycle(N_PER_FIXTURE).blend(
+        "blog.Post",
+        author=user,
+        category=post.category,
+        location=post.location,
+        is_published=True,
+    )
+    mixer.cycle(N_PER_FIXTURE).blend("blog.Comment", post=post)
+    comment = mixer.blend("blog.Comment", post=post, author=user)
+    # Бюджеты — для прогретого кэша справочников, как в работающем
+    # процессе; загрузка таблиц в память проверяется в test_lookups.py.
+    categories.snapshot()
+    locations.snapshot()
+    authors.get_many(get_user_model().objects.values_list("pk", flat=True))
+    authors.get_by_username(user.username)
+    return {
+        "post_id": post.id,
+        "category_slug": post.category.slug,
+        "username": user.username,
+        "comment_id": comment.id,
+        "kind": "posts",
+        "q": post.title.split()[0],
+    }
+
+
+@pytest.mark.parametrize(
+    ("url_name", "kwargs", "method", "client_name"),
+    [
+        pytest.param(
+            url_name, kwargs, method, client_name,
+            id=f"{url_name}[{client_name}]",
+        )
+        for url_name, kwargs, method, clients in CASES
+        for client_name in clients
+    ],
+)
+def test_query_budget(
+    request, blog_data, query_budget, url_name, kwargs, method, client_name
+):
+    client = request.getfixturevalue(client_name)
+    url = reverse(url_name, kwargs={key: blog_data[key] for key in kwargs})
+    if method == "post":
+        data = {"text": "Комментарий"}
+    else:
+        data = {key: blog_data[key] for key in QUERY.get(url_name, ())}
+    with query_budget(f"{url_name}[{client_name}]"):
+        response = getattr(client, method)(url, data)
+    assert response.status_code < 400
+
+
+def test_every_url_has_a_budget():
+    resolver = get_resolver()
+    names = set()
+    for namespace in ("blog", "pages"):
+        _, sub_resolver = resolver.namespace_dict[namespace]
+        names |= {
+            f"{namespace}:{pattern.name}"
+            for pattern in sub_resolver.url_patterns
+        }
+    missing = names - {case[0] for case in CASES}
+    assert not missing, (
+        f"Добавьте бюджет запросов для URL: {', '.join(sorted(missing))}."
+    )
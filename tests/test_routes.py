@@ -0,0 +1,77 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import (
+    NoReverseMatch,
+    get_script_prefix,
+    reverse,
+    set_script_prefix,
+)
+
+from blog.routes import blog_url
+
+
+@pytest.mark.parametrize(
+    ("view_name", "args"),
+    [
+        ("blog:index", ()),
+        ("blog:create_post", ()),
+        ("blog:post_detail", (7,)),
+        ("blog:profile", ("user.name+tag@mail",)),
+        ("blog:profile", ("путник",)),
+        ("blog:category_posts", ("some-slug_1",)),
+        ("blog:edit_comment", (7, 12)),
+        ("pages:about", ()),
+    ],
+)
+def test_blog_url_matches_reverse(view_name, args):
+    assert blog_url(view_name, *args) == reverse(view_name, args=args)
+
+
+def test_blog_url_kwargs_and_bad_arguments():
+    assert blog_url("blog:delete_comment", post_id=1, comment_id=2) == (
+        reverse("blog:delete_comment", kwargs={"post_id": 1, "comment_id": 2})
+    )
+    with pytest.raises(NoReverseMatch):
+        blog_url("blog:post_detail")
+    with pytest.raises(NoReverseMatch):
+        blog_url("blog:post_detail", 1, 2)
+
+
+@pytest.mark.django_db
+def test_model_urls(comment_to_a_post):
+    comment = comment_to_a_post
+    post = comment.post
+    assert post.detail_url == f"/posts/{post.id}/"
+    assert post.author_url == f"/profile/{post.author.username}/"
+    assert post.category_url == f"/category/{post.category.slug}/"
+    assert comment.edit_url == (
+        f"/posts/{post.id}/edit_comment/{comment.id}/"
+    )
+
+
+@pytest.mark.django_db
+def test_pages_respect_script_prefix(client, post_with_published_location):
+    post = post_with_published_location
+    prefix = get_script_prefix()
+    set_script_prefix("/blog/")
+    try:
+        content = client.get("/").content.decode("utf-8")
+        assert blog_url("blog:index") == "/blog/"
+    finally:
+        set_script_prefix(prefix)
+    assert f'href="/blog/posts/{post.id}/"' in content, (
+        "Убедитесь, что ссылки учитывают SCRIPT_NAME, как {% url %}."
+    )
+    assert f'href="/blog/profile/{post.author.username}/"' in content
+    assert blog_url("blog:index") == "/"
+
+
+def test_benchmark_urls_command():
+    out = StringIO()
+    call_command("benchmark_urls", number=10, repeat=1, stdout=out)
+    urls = json.loads(out.getvalue())["urls"]
+    assert urls["post_detail"]["url"] == "/posts/12345/"
+    assert urls["post_detail"]["blog_url_us"] > 0
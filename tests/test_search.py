@@ -0,0 +1,79 @@
+import pytest
+from django.test import override_settings
+from mixer.backend.django import Mixer
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+SIMPLE_BACKEND = "blog.search.SimpleSearchBackend"
+
+
+@pytest.fixture(params=[None, SIMPLE_BACKEND], ids=["default", "simple"])
+def backend(request):
+    with override_settings(BLOG_SEARCH_BACKEND=request.param):
+        yield
+
+
+@pytest.fixture
+def make_post(mixer: Mixer, user, published_category):
+    def make(**kwargs):
+        kwargs.setdefault("is_published", True)
+        return mixer.blend(
+            "blog.Post", author=user, category=published_category, **kwargs
+        )
+
+    return make
+
+
+def _found(client, query, **params):
+    response = client.get("/search/", {"q": query, **params})
+    assert response.status_code == 200
+    return [post.id for post in response.context["page_obj"]]
+
+
+def test_search_finds_visible_posts(backend, make_post, client):
+    # SQLite без FTS5 сравнивает кириллицу с учётом регистра,
+    # поэтому слова в нижнем регистре.
+    in_title = make_post(title="На перевал Дятлова", text="Обычный текст")
+    in_text = make_post(title="Заметка", text="Шли через перевал к озеру")
+    make_post(title="Скрытый перевал", is_published=False)
+    make_post(title="Про другое", text="Ничего общего")
+
+    found = _found(client, "перевал")
+    assert set(found) == {in_title.id, in_text.id}, (
+        "Убедитесь, что поиск находит опубликованные посты по заголовку"
+        " и тексту и не показывает скрытые."
+    )
+
+
+def test_search_ranks_title_matches_first(make_post, client):
+    in_text = make_post(title="Заметка", text="Шли через перевал к озеру")
+    in_title = make_post(title="Перевал Дятлова", text="Обычный текст")
+    assert _found(client, "перевал") == [in_title.id, in_text.id]
+
+
+def test_search_index_follows_edits(backend, make_post, client):
+    post = make_post(title="Совсем старое название")
+    post.title = "Совсем новое название"
+    post.save()
+    assert _found(client, "новое") == [post.id]
+    assert _found(client, "старое") == []
+    post.delete()
+    assert _found(client, "новое") == []
+
+
+@pytest.mark.parametrize("query", ['"', "AND OR NOT", "тест*) (", "NEAR("])
+def test_search_survives_odd_queries(backend, make_post, client, query):
+    make_post(title="Тест")
+    _found(client, query)
+
+
+def test_search_pagination_keeps_query(make_post, client):
+    for _ in range(N_PER_PAGE + 1):
+        make_post(title="Горный маршрут")
+    response = client.get("/search/", {"q": "горный"})
+    assert "?q=%D0%B3%D0%BE%D1%80%D0%BD%D1%8B%D0%B9&amp;page=2" in (
+        response.content.decode("utf-8")
+    ), "Убедитесь, что ссылки пагинатора сохраняют поисковый запрос."
+    assert len(_found(client, "горный", page=2)) == 1
@@ -0,0 +1,180 @@
+import json
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.checks import run_checks
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from blog import sessions
+from blog.sessions import PendingSessions, SessionStore, pending_sessions
+
+pytestmark = [pytest.mark.django_db]
+
+
+def session_key(client):
+    return client.cookies[settings.SESSION_COOKIE_NAME].value
+
+
+@pytest.fixture
+def write_behind_client(user):
+    with override_settings(SESSION_ENGINE="blog.sessions"):
+        client = Client()
+        client.force_login(user)
+        yield client
+
+
+def test_session_is_written_to_database_later(write_behind_client):
+    key = session_key(write_behind_client)
+    assert not Session.objects.filter(session_key=key).exists(), (
+        "Убедитесь, что сессия пишется в базу не сразу, а из буфера."
+    )
+    with CaptureQueriesContext(connection) as queries:
+        response = write_behind_client.get(reverse("blog:edit_profile"))
+    assert response.status_code == 200
+    assert not any("django_session" in q["sql"] for q in queries), (
+        "Убедитесь, что сессия авторизованного пользователя читается "
+        "из кэша."
+    )
+    assert pending_sessions.flush() == 1
+    row = Session.objects.get(session_key=key)
+    assert row.get_decoded()["_auth_user_id"] == str(
+        write_behind_client.session["_auth_user_id"]
+    )
+
+
+def test_session_survives_cache_loss(write_behind_client):
+    url = reverse("blog:edit_profile")
+    cache.clear()
+    assert write_behind_client.get(url).status_code == 200, (
+        "Убедитесь, что сессия, ещё не записанная в базу, читается "
+        "из буфера."
+    )
+    pending_sessions.flush()
+    cache.clear()
+    assert write_behind_client.get(url).status_code == 200, (
+        "Убедитесь, что сессия, которой нет в кэше, читается из базы."
+    )
+
+
+def test_logout_is_not_undone_by_flush(write_behind_client):
+    key = session_key(write_behind_client)
+    pending_sessions.flush()
+    write_behind_client.get(reverse("blog:edit_profile"))
+    write_behind_client.get(reverse("logout"))
+    pending_sessions.flush()
+    cache.clear()
+    assert not SessionStore().exists(key), (
+        "Убедитесь, что выход удаляет сессию из базы и буфера."
+    )
+    response = Client().get(
+        reverse("blog:edit_profile"),
+        HTTP_COOKIE=f"{settings.SESSION_COOKIE_NAME}={key}",
+    )
+    assert response.status_code == 302
+
+
+def test_logout_reaches_other_processes(write_behind_client, monkeypatch):
+    key = session_key(write_behind_client)
+    # Буфер другого рабочего процесса, сохранившего ту же сессию.
+    other = PendingSessions()
+    other.add(key, *pending_sessions.get(key))
+    write_behind_client.get(reverse("logout"))
+    monkeypatch.setattr(sessions, "pending_sessions", other)
+    response = Client().get(
+        reverse("blog:edit_profile"),
+        HTTP_COOKIE=f"{settings.SESSION_COOKIE_NAME}={key}",
+    )
+    assert response.status_code == 302, (
+        "Убедитесь, что сессия, удалённая в одном процессе, не читается "
+        "из буфера другого."
+    )
+    other.add(key, "data", timezone.now() + timedelta(days=1))
+    assert other.flush() == 0
+    assert not Session.objects.filter(session_key=key).exists(), (
+        "Убедитесь, что буфер другого процесса не записывает в базу "
+        "удалённую сессию."
+    )
+
+
+def test_process_local_session_cache_is_refused():
+    with override_settings(SESSION_ENGINE="blog.sessions"):
+        errors = [error.id for error in run_checks()]
+    assert "blog.E001" in errors
+    with override_settings(
+        SESSION_ENGINE="django.contrib.sessions.backends.db"
+    ):
+        errors = [error.id for error in run_checks()]
+    assert "blog.E001" not in errors
+
+
+@pytest.mark.parametrize("mode", list(settings.BLOG_SESSION_ENGINES))
+def test_every_session_mode_keeps_login(user, mode):
+    with override_settings(
+        SESSION_ENGINE=settings.BLOG_SESSION_ENGINES[mode]
+    ):
+        client = Client()
+        client.force_login(user)
+        response = client.get(reverse("blog:edit_profile"))
+    assert response.status_code == 200
+
+
+def test_cleanup_sessions_deletes_expired_in_batches():
+    now = timezone.now()
+    Session.objects.bulk_create(
+        [
+            Session(
+                session_key=f"expired{i}",
+                session_data="",
+                expire_date=now - timedelta(days=1),
+            )
+            for i in range(5)
+        ]
+        + [
+            Session(
+                session_key="alive",
+                session_data="",
+                expire_date=now + timedelta(days=1),
+            )
+        ]
+    )
+    with CaptureQueriesContext(connection) as queries:
+        call_command(
+            "cleanup_sessions", batch_size=2, pause=0, stdout=StringIO()
+        )
+    assert list(Session.objects.values_list("session_key", flat=True)) == [
+        "alive"
+    ]
+    deletes = [q for q in queries if q["sql"].startswith("DELETE")]
+    assert len(deletes) == 3, (
+        "Убедитесь, что cleanup_sessions удаляет сессии пачками."
+    )
+
+
+def test_benchmark_sessions_reports_json(user):
+    out = StringIO()
+    call_command(
+        "benchmark_sessions",
+        session_modes=["db", "write_behind"],
+        mode="client",
+        concurrency=1,
+        requests=3,
+        warmup=0,
+        stdout=out,
+    )
+    report = json.loads(out.getvalue())
+    assert report["sessions"].keys() == {"db", "write_behind"}
+    for result in report["sessions"].values():
+        assert result["errors"] == 0
+    assert (
+        report["sessions"]["write_behind"]["queries"]
+        < report["sessions"]["db"]["queries"]
+    )
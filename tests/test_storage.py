@@ -0,0 +1,79 @@
+import os
+import time
+from io import StringIO
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import override_settings
+
+from blog.storage import content_addressed_storage
+
+pytestmark = [pytest.mark.django_db]
+
+DAY = 24 * 60 * 60
+
+
+@pytest.fixture
+def media_root(tmp_path):
+    with override_settings(MEDIA_ROOT=str(tmp_path)):
+        yield tmp_path
+
+
+def _age(path, seconds):
+    moment = time.time() - seconds
+    os.utime(path, (moment, moment))
+
+
+def test_same_bytes_are_stored_once(media_root):
+    first = content_addressed_storage.save("a.jpg", ContentFile(b"image"))
+    second = content_addressed_storage.save("b.JPG", ContentFile(b"image"))
+    other = content_addressed_storage.save("c.jpg", ContentFile(b"other"))
+    assert first == second, (
+        "Убедитесь, что одинаковое содержимое сохраняется под одним именем."
+    )
+    assert other != first
+    files = [name for _, _, names in os.walk(media_root) for name in names]
+    assert len(files) == 2
+
+
+def test_reused_blob_is_touched(media_root):
+    name = content_addressed_storage.save("a.jpg", ContentFile(b"image"))
+    path = content_addressed_storage.path(name)
+    _age(path, DAY)
+    content_addressed_storage.save("b.jpg", ContentFile(b"image"))
+    assert os.stat(path).st_mtime > time.time() - 60, (
+        "Убедитесь, что повторное использование блоба обновляет его mtime: "
+        "иначе gc_media может удалить его вопреки --grace."
+    )
+
+
+def test_gc_media(media_root, mixer, user, published_category):
+    kept = content_addressed_storage.save("kept.jpg", ContentFile(b"kept"))
+    orphan = content_addressed_storage.save("orphan.jpg", ContentFile(b"x"))
+    fresh = content_addressed_storage.save("fresh.jpg", ContentFile(b"new"))
+    kept_variant = kept.replace(".jpg", "-320.webp")
+    orphan_variant = orphan.replace(".jpg", "-320.webp")
+    # Копии пишутся под предсказуемыми именами в обычное хранилище.
+    for name in (kept_variant, orphan_variant):
+        default_storage.save(name, ContentFile(b"variant"))
+    mixer.blend(
+        "blog.Post", author=user, category=published_category, image=kept
+    )
+    for name in (kept, orphan, kept_variant, orphan_variant):
+        _age(content_addressed_storage.path(name), DAY)
+
+    call_command("gc_media", grace=60 * 60, stdout=StringIO())
+
+    exists = content_addressed_storage.exists
+    assert exists(kept) and exists(kept_variant), (
+        "Убедитесь, что gc_media не удаляет блобы, на которые ссылаются "
+        "посты, и их копии."
+    )
+    assert not exists(orphan) and not exists(orphan_variant), (
+        "Убедитесь, что gc_media удаляет блобы без ссылок и их копии."
+    )
+    assert exists(fresh), (
+        "Убедитесь, что gc_media не удаляет файлы моложе --grace."
+    )
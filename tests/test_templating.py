@@ -0,0 +1,56 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from blog.templating import (
+    copy_engine,
+    default_engine,
+    is_cached,
+    preload_templates,
+    template_names,
+)
+
+
+def test_template_names_cover_project_and_apps():
+    names = template_names(default_engine())
+    assert {"blog/index.html", "includes/post_card.html"} <= set(names)
+    assert "admin/base.html" in names, (
+        "Убедитесь, что предзагрузка охватывает и шаблоны приложений."
+    )
+
+
+def test_preload_fills_cached_loader():
+    engine = copy_engine(default_engine(), cached=True)
+    assert is_cached(engine)
+    compiled, errors, _ = preload_templates(engine)
+    assert not errors
+    (loader,) = engine.template_loaders
+    assert compiled == len(template_names(engine))
+    assert "blog/index.html" in loader.get_template_cache, (
+        "Убедитесь, что после предзагрузки шаблоны лежат в кэше cached.Loader."
+    )
+
+
+def test_preload_skips_uncached_engine():
+    engine = copy_engine(default_engine(), cached=False)
+    assert preload_templates(engine) == (0, {}, 0.0)
+    compiled, errors, _ = preload_templates(engine, force=True)
+    assert compiled and not errors
+
+
+def test_warm_templates_command():
+    out = StringIO()
+    call_command("warm_templates", stdout=out)
+    assert "Скомпилировано шаблонов" in out.getvalue()
+
+
+@pytest.mark.django_db
+def test_benchmark_templates_command(many_posts_with_published_locations):
+    out = StringIO()
+    call_command("benchmark_templates", requests=2, stdout=out)
+    engines = json.loads(out.getvalue())["engines"]
+    assert set(engines) == {"uncached", "cached", "preloaded"}
+    assert engines["preloaded"]["templates"] > 0
+    assert {"first_ms", "p50_ms", "p95_ms"} <= set(engines["cached"])
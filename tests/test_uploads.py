@@ -0,0 +1,57 @@
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from PIL import Image
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def post_data(published_category, published_location):
+    return {
+        "title": "Заголовок",
+        "text": "Текст",
+        "pub_date": "2024-01-01 10:00",
+        "category": published_category.id,
+        "location": published_location.id,
+        "is_published": "on",
+    }
+
+
+def _jpeg():
+    image_data = BytesIO()
+    Image.new("RGB", (100, 100)).save(image_data, "JPEG")
+    return image_data.getvalue()
+
+
+def test_image_upload_is_saved(user_client, post_data):
+    user_client.post(
+        "/posts/create/",
+        {**post_data, "image": SimpleUploadedFile("pic.jpg", _jpeg())},
+    )
+    post = Post.objects.get()
+    assert post.image, "Убедитесь, что изображение сохраняется с постом."
+
+
+@pytest.mark.parametrize(
+    ("content", "error"),
+    [
+        (b"<?php echo 1; ?>" * 100, "Загрузите изображение"),
+        (b"\xff\xd8\xff" + b"0" * 5000, "Размер файла превышает"),
+    ],
+    ids=["not an image", "too large"],
+)
+def test_bad_uploads_are_rejected(user_client, post_data, content, error):
+    with override_settings(BLOG_IMAGE_MAX_UPLOAD_SIZE=1000):
+        response = user_client.post(
+            "/posts/create/",
+            {**post_data, "image": SimpleUploadedFile("pic.jpg", content)},
+        )
+    assert error in response.content.decode("utf-8"), (
+        "Убедитесь, что недопустимый файл отклоняется с понятной ошибкой."
+    )
+    assert not Post.objects.exists()